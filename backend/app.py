@@ -1,51 +1,258 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, current_app, request, jsonify, abort, send_from_directory
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.local import LocalProxy
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_cors import CORS
+from flask_jwt_extended import (JWTManager, create_access_token, create_refresh_token,
+                                decode_token, get_jwt, get_jwt_identity, jwt_required)
 import os
-from datetime import datetime
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
-
-# --- App Initialization and Config ---
-app = Flask(__name__)
-
-# --- CORS CONFIGURATION ---
-CORS(app,
-    resources={r"/api/*": {
-        "origins": [
-            "http://localhost:5173",
-            "https://mobicloud-blog.shubhamtel.me",
-            "https://fullstack-blog-project-shubh2415.vercel.app",
-            "https://fullstack-blog-project-shubham-telis-projects.vercel.app"
-        ],
-        "methods": ["GET", "POST", "PUT", "DELETE"],
-        "allow_headers": ["Content-Type", "Authorization"]
-    }}
-)
-
-# --- Cloudinary Configuration ---
-cloudinary.config(
-  cloud_name = os.environ.get('CLOUDINARY_CLOUD_NAME'),
-  api_key = os.environ.get('CLOUDINARY_API_KEY'),
-  api_secret = os.environ.get('CLOUDINARY_API_SECRET')
-)
+import json
+import base64
+import hashlib
+import hmac
+from datetime import datetime, timedelta
+from sqlalchemy import func, create_engine, insert, update, delete, literal, bindparam
+from sqlalchemy.exc import IntegrityError
+from search import register_search_ddl, apply_search
+from cache import ResponseCache, InProcessBackend, NullBackend
+from uploads import receive_upload
+from auth import role_required, PrincipalCache, TokenDenylist
+from passwords import PasswordHasher, HasherBusy
+from ratelimit import TokenBucketLimiter, InProcessBucketBackend
+from media import (MediaWorker, process_image, variant_public_id, variant_paths_for,
+                   all_variant_public_ids, base_public_id)
+from storage import CloudinaryStorage, LocalStorage, InstrumentedStorage, file_digest, DELETE_BATCH_SIZE
+from engine import profile_for, engine_options, install_profile, attach_pool_metrics, PoolMetrics
+from routing import RoutingSession, ReplicaRouter
+from cooperative import run_native
+from metrics import MetricsRegistry, RequestMetrics, render_histogram
+from profiler import SlowRequestProfiler
+from serializers import (BLOG_LISTING, BLOG_DETAIL, COMMENT, PENDING_LISTING, PENDING_DETAIL, MY_POST,
+                         json_provider_class)
+
+# Importing this module only defines the models and routes; create_app()
+# reads the environment and builds an app (wsgi.py for gunicorn, scripts call
+# it themselves). Startup opens no database connection, leaves Cloudinary and
+# Pillow unimported until first use and never creates tables: run
+# `python migrations.py` when deploying. check_startup.py holds startup to
+# its time budget.
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+jwt = JWTManager()
+api = Blueprint('api', __name__)
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 instance_path = os.path.join(basedir, 'instance')
-if not os.path.exists(instance_path): os.makedirs(instance_path)
 
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
-DATABASE_URL = os.environ.get('DATABASE_URL')
 
-if DATABASE_URL:
-    app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL.replace("postgres://", "postgresql://", 1)
-else:
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(instance_path, 'users.db')
+def _service(name):
+    return LocalProxy(lambda: current_app.extensions['services'][name])
+
+# Per-app services, built by create_app; these names resolve to the current app's.
+metrics_registry = _service('metrics_registry')
+password_hasher = _service('password_hasher')
+login_ip_limiter = _service('login_ip_limiter')
+login_email_limiter = _service('login_email_limiter')
+media_storage = _service('media_storage')
+response_cache = _service('response_cache')
+media_worker = _service('media_worker')
+principal_cache = _service('principal_cache')
+token_denylist = _service('token_denylist')
+db_engines = _service('db_engines')
+
+
+def create_app():
+    """Builds the app from the environment without connecting to the database or Cloudinary."""
+    # --- App Initialization and Config ---
+    app = Flask(__name__)
+
+    # --- JSON encoding (JSON_ENCODER=auto uses orjson when installed; 'stdlib' keeps Flask's encoder) ---
+    app.config['JSON_ENCODER'] = os.environ.get('JSON_ENCODER', 'auto')
+    app.json = json_provider_class(app.config['JSON_ENCODER'])(app)
+
+    # --- CORS CONFIGURATION ---
+    CORS(app,
+        resources={r"/api/*": {
+            "origins": [
+                "http://localhost:5173",
+                "https://mobicloud-blog.shubhamtel.me",
+                "https://fullstack-blog-project-shubh2415.vercel.app",
+                "https://fullstack-blog-project-shubham-telis-projects.vercel.app"
+            ],
+            "methods": ["GET", "POST", "PUT", "DELETE"],
+            "allow_headers": ["Content-Type", "Authorization"]
+        }}
+    )
+
+    # --- Cloudinary Configuration (applied when the first upload or delete runs) ---
+    app.config['CLOUDINARY_CLOUD_NAME'] = os.environ.get('CLOUDINARY_CLOUD_NAME')
+    app.config['CLOUDINARY_API_KEY'] = os.environ.get('CLOUDINARY_API_KEY')
+    app.config['CLOUDINARY_API_SECRET'] = os.environ.get('CLOUDINARY_API_SECRET')
+
+    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+    DATABASE_URL = os.environ.get('DATABASE_URL')
+
+    if DATABASE_URL:
+        app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+    else:
+        os.makedirs(instance_path, exist_ok=True)
+        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(instance_path, 'users.db')
+
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    # --- Engine profile (DB_PROFILE=auto picks sqlite or postgres from the URI; see engine.py) ---
+    # Pool sizes follow the server's shape (see gunicorn.conf.py): WEB_CONCURRENCY
+    # worker processes, each running as many requests at once as its worker class
+    # allows, sharing DB_MAX_CONNECTIONS on Postgres. A gevent worker holds many
+    # connections open but only DB_POOL_SIZE of them query at the same moment.
+    app.config['DB_PROFILE'] = profile_for(app.config['SQLALCHEMY_DATABASE_URI'], os.environ.get('DB_PROFILE', 'auto'))
+    app.config['DB_BUSY_TIMEOUT_MS'] = int(os.environ.get('DB_BUSY_TIMEOUT_MS', 5000))
+    app.config['WEB_WORKER_CLASS'] = os.environ.get('WEB_WORKER_CLASS', 'gthread')
+    request_slots = {
+        'sync': 1,
+        'gevent': int(os.environ.get('DB_POOL_SIZE', 10)),
+    }.get(app.config['WEB_WORKER_CLASS'], int(os.environ.get('WEB_THREADS', 4)))
+    pool_settings = dict(
+        workers=int(os.environ.get('WEB_CONCURRENCY', 1)),
+        threads=request_slots,
+        background_threads=int(os.environ.get('MEDIA_WORKER_THREADS', 1)),
+        max_connections=int(os.environ.get('DB_MAX_CONNECTIONS', 20)),
+        pool_timeout=int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        busy_timeout_ms=app.config['DB_BUSY_TIMEOUT_MS'],
+        statement_timeout_ms=int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 15000)),
+    )
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+        app.config['SQLALCHEMY_DATABASE_URI'], app.config['DB_PROFILE'], **pool_settings)
+    db.init_app(app)
+    with app.app_context():
+        install_profile(db.engine, app.config['DB_PROFILE'], app.config['DB_BUSY_TIMEOUT_MS'])
+        attach_pool_metrics(db.engine)
+        db_engines = {'primary': db.engine}
+
+    # --- Read replicas (comma-separated URLs; GET/HEAD requests read from them, see routing.py) ---
+    # A client that just wrote reads from the primary for REPLICA_STICKY_SECONDS.
+    app.config['DATABASE_REPLICA_URLS'] = [url.strip().replace("postgres://", "postgresql://", 1)
+                                           for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    app.config['REPLICA_STICKY_SECONDS'] = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    replica_engines = []
+    for i, replica_url in enumerate(app.config['DATABASE_REPLICA_URLS']):
+        replica_profile = profile_for(replica_url, os.environ.get('DB_PROFILE', 'auto'))
+        replica_engine = create_engine(replica_url, **engine_options(replica_url, replica_profile, **pool_settings))
+        install_profile(replica_engine, replica_profile, app.config['DB_BUSY_TIMEOUT_MS'])
+        attach_pool_metrics(replica_engine)
+        db_engines[f'replica-{i}'] = replica_engine
+        replica_engines.append(replica_engine)
+    ReplicaRouter(app, replica_engines, InProcessBackend(10000), app.config['REPLICA_STICKY_SECONDS'])
+
+    # --- Metrics (Prometheus text format at /metrics; set METRICS_TOKEN to require a bearer token) ---
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+    metrics_registry = MetricsRegistry()
+    request_metrics = RequestMetrics(app, metrics_registry)
+    with app.app_context():
+        request_metrics.watch_engine(db.engine, 'primary')
+    for replica_engine in replica_engines:
+        request_metrics.watch_engine(replica_engine, 'replica')
+    media_storage_seconds = metrics_registry.histogram(
+        'media_storage_duration_seconds', 'Media storage call latency.', ('backend', 'operation'))
+    metrics_registry.add_collector(_collect_cache_metrics)
+    metrics_registry.add_collector(_collect_pool_metrics)
+
+    # --- Slow-request profiler (opt-in: PROFILE_SLOW_REQUESTS_MS > 0 writes folded stacks to PROFILE_DIR) ---
+    app.config['PROFILE_SLOW_REQUESTS_MS'] = int(os.environ.get('PROFILE_SLOW_REQUESTS_MS', 0))
+    app.config['PROFILE_SAMPLE_INTERVAL_MS'] = float(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', 5))
+    app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR', os.path.join(instance_path, 'profiles'))
+    if app.config['PROFILE_SLOW_REQUESTS_MS'] > 0:
+        SlowRequestProfiler(app, app.config['PROFILE_SLOW_REQUESTS_MS'] / 1000,
+                            app.config['PROFILE_SAMPLE_INTERVAL_MS'] / 1000, app.config['PROFILE_DIR'])
+
+    # --- JWT Auth (access tokens carry the role claim; JWT_SECRET_KEY is required outside debug/testing) ---
+    app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY')
+    if not app.config['JWT_SECRET_KEY']:
+        if not (app.debug or app.testing):
+            raise RuntimeError("JWT_SECRET_KEY is not set; refusing to sign tokens with a known key. "
+                               "Set it, or FLASK_DEBUG=1 for local development.")
+        app.config['JWT_SECRET_KEY'] = 'dev-only-insecure-jwt-secret'
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 60)))
+    app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=int(os.environ.get('JWT_REFRESH_TOKEN_DAYS', 30)))
+    app.config['JWT_ERROR_MESSAGE_KEY'] = 'message'
+    jwt.init_app(app)
+    principal_cache = PrincipalCache(_load_principal)
+    token_denylist = TokenDenylist(db, RevokedToken)
+
+    # --- Password hashing (raising the cost rehashes each user's password on their next login) ---
+    app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 16))
+    password_hasher = PasswordHasher(app.config['PASSWORD_HASH_METHOD'],
+                                     workers=app.config['PASSWORD_HASH_WORKERS'],
+                                     max_pending=app.config['PASSWORD_HASH_MAX_PENDING'])
+
+    # --- Login rate limits (token buckets per client IP and per email; a burst of 0 disables one) ---
+    # Behind a reverse proxy set PROXY_FIX_HOPS so the client IP comes from X-Forwarded-For;
+    # with 0, a request carrying that header logs a warning (see _warn_unused_forwarded_for).
+    app.config['PROXY_FIX_HOPS'] = int(os.environ.get('PROXY_FIX_HOPS', 0))
+    app.config['LOGIN_IP_BURST'] = int(os.environ.get('LOGIN_IP_BURST', 20))
+    app.config['LOGIN_IP_PER_MINUTE'] = float(os.environ.get('LOGIN_IP_PER_MINUTE', 10))
+    app.config['LOGIN_EMAIL_BURST'] = int(os.environ.get('LOGIN_EMAIL_BURST', 5))
+    app.config['LOGIN_EMAIL_PER_MINUTE'] = float(os.environ.get('LOGIN_EMAIL_PER_MINUTE', 2))
+    if app.config['PROXY_FIX_HOPS']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_HOPS'])
+    rate_limit_backend = InProcessBucketBackend()
+    login_ip_limiter = TokenBucketLimiter(rate_limit_backend, app.config['LOGIN_IP_BURST'], app.config['LOGIN_IP_PER_MINUTE'])
+    login_email_limiter = TokenBucketLimiter(rate_limit_backend, app.config['LOGIN_EMAIL_BURST'], app.config['LOGIN_EMAIL_PER_MINUTE'])
+
+    # --- HTTP caching (CDN_MAX_AGE > 0 lets a shared cache serve blog reads without revalidating) ---
+    app.config['CDN_MAX_AGE'] = int(os.environ.get('CDN_MAX_AGE', 0))
+
+    # --- Media Storage & Jobs (uploads/deletes run off the request path) ---
+    # MEDIA_BACKEND=local keeps media on disk under MEDIA_ROOT and serves it from
+    # /media; set MEDIA_ACCEL_REDIRECT to an nginx internal location to hand the
+    # bytes to nginx instead of Python.
+    app.config['MEDIA_BACKEND'] = os.environ.get('MEDIA_BACKEND', 'cloudinary')
+    app.config['MEDIA_ROOT'] = os.environ.get('MEDIA_ROOT', os.path.join(basedir, 'static', 'uploads'))
+    app.config['MEDIA_PUBLIC_URL'] = os.environ.get('MEDIA_PUBLIC_URL', 'http://localhost:5000')
+    app.config['MEDIA_ACCEL_REDIRECT'] = os.environ.get('MEDIA_ACCEL_REDIRECT')
+    app.config['MEDIA_STAGING_DIR'] = os.environ.get('MEDIA_STAGING_DIR', os.path.join(instance_path, 'media_staging'))
+    app.config['MEDIA_WORKER_THREADS'] = int(os.environ.get('MEDIA_WORKER_THREADS', 1))
+    app.config['MEDIA_JOB_MAX_ATTEMPTS'] = int(os.environ.get('MEDIA_JOB_MAX_ATTEMPTS', 5))
+    if app.config['MEDIA_BACKEND'] == 'local':
+        media_storage = LocalStorage(app.config['MEDIA_ROOT'], app.config['MEDIA_PUBLIC_URL'])
+    else:
+        media_storage = CloudinaryStorage(app.config['CLOUDINARY_CLOUD_NAME'], app.config['CLOUDINARY_API_KEY'],
+                                          app.config['CLOUDINARY_API_SECRET'])
+    media_storage = InstrumentedStorage(media_storage, media_storage_seconds, app.config['MEDIA_BACKEND'])
+    media_worker = MediaWorker(
+        app, db, MediaJob, _run_media_job, _fail_media_job,
+        threads=app.config['MEDIA_WORKER_THREADS'],
+        max_attempts=app.config['MEDIA_JOB_MAX_ATTEMPTS']
+    )
+
+    # --- Submission retention (purge_submissions.py removes approved submissions older than this) ---
+    app.config['SUBMISSION_RETENTION_DAYS'] = int(os.environ.get('SUBMISSION_RETENTION_DAYS', 180))
+
+    # --- Response Cache (public blog reads; 0 disables it) ---
+    app.config['RESPONSE_CACHE_TTL'] = int(os.environ.get('RESPONSE_CACHE_TTL', 30))
+    app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+    response_cache = ResponseCache(
+        InProcessBackend(app.config['RESPONSE_CACHE_MAX_ENTRIES']) if app.config['RESPONSE_CACHE_TTL'] > 0 else NullBackend(),
+        ttl=app.config['RESPONSE_CACHE_TTL']
+    )
+
+    app.extensions['services'] = {
+        'metrics_registry': metrics_registry,
+        'password_hasher': password_hasher,
+        'login_ip_limiter': login_ip_limiter,
+        'login_email_limiter': login_email_limiter,
+        'media_storage': media_storage,
+        'response_cache': response_cache,
+        'media_worker': media_worker,
+        'principal_cache': principal_cache,
+        'token_denylist': token_denylist,
+        'db_engines': db_engines,
+    }
+    app.register_blueprint(api)
+    return app
 
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db = SQLAlchemy(app)
 
 # --- Database Models (Updated for Cloudinary) ---
 class User(db.Model):
@@ -56,6 +263,9 @@ class User(db.Model):
     user_type = db.Column(db.String(50), nullable=False)
     profile_image_url = db.Column(db.String(300), nullable=True)
     profile_image_public_id = db.Column(db.String(200), nullable=True)
+    profile_image_thumb_url = db.Column(db.String(300), nullable=True)
+    profile_image_card_url = db.Column(db.String(300), nullable=True)
+    profile_image_status = db.Column(db.String(20), nullable=True)
     blogs = db.relationship('Blog', backref='author', lazy=True)
     comments = db.relationship('Comment', backref='commenter', lazy=True)
     pending_blogs = db.relationship('PendingBlog', backref='author', lazy=True)
@@ -66,11 +276,26 @@ class Blog(db.Model):
     content = db.Column(db.Text, nullable=False)
     image_url = db.Column(db.String(300), nullable=False)
     image_public_id = db.Column(db.String(200), nullable=False)
+    image_thumb_url = db.Column(db.String(300), nullable=True)
+    image_card_url = db.Column(db.String(300), nullable=True)
+    image_status = db.Column(db.String(20), nullable=False, default='ready')
     category = db.Column(db.String(50), nullable=False, default='General')
     pub_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Version of the blog's public representation (its own fields, its comments
+    # and the author/commenter profile images); drives ETag/Last-Modified.
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     comments = db.relationship('Comment', backref='post', lazy=True, cascade="all, delete-orphan")
 
+    # Backs the keyset-paginated listing in get_blogs (plain feed and per-category feed).
+    __table_args__ = (
+        db.Index('ix_blog_pub_date_id', 'pub_date', 'id'),
+        db.Index('ix_blog_category_pub_date_id', 'category', 'pub_date', 'id'),
+        db.Index('ix_blog_updated_at', 'updated_at'),
+    )
+
+register_search_ddl(Blog.__table__)
+
 class Comment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
@@ -78,280 +303,1021 @@ class Comment(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     blog_id = db.Column(db.Integer, db.ForeignKey('blog.id'), nullable=False)
 
+    # Backs the per-blog, newest-first comment pages.
+    __table_args__ = (
+        db.Index('ix_comment_blog_id_pub_date_id', 'blog_id', 'pub_date', 'id'),
+    )
+
 class PendingBlog(db.Model):
+    # Once approved, a submission keeps only its title and a link to the
+    # published blog; the content and images live on the Blog row alone.
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
     image_public_id = db.Column(db.String(200), nullable=False)
     image_url = db.Column(db.String(300), nullable=False)
+    image_thumb_url = db.Column(db.String(300), nullable=True)
+    image_card_url = db.Column(db.String(300), nullable=True)
+    image_status = db.Column(db.String(20), nullable=False, default='ready')
     category = db.Column(db.String(50), nullable=False, default='General')
     status = db.Column(db.String(50), nullable=False, default='pending')
     rejection_reason = db.Column(db.Text, nullable=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     submitted_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    blog_id = db.Column(db.Integer, db.ForeignKey('blog.id'), nullable=True, index=True)
 
-# --- Helper Function ---
-def _delete_from_cloudinary(public_id):
-    if not public_id: return
+    # Back the moderation queue in get_pending_blogs and the author's list in get_my_posts.
+    __table_args__ = (
+        db.Index('ix_pending_blog_status_submitted_date', 'status', 'submitted_date'),
+        db.Index('ix_pending_blog_user_id_submitted_date', 'user_id', 'submitted_date'),
+    )
+
+class FeedEntry(db.Model):
+    """One precomputed home-page row per published blog.
+
+    Kept current by the endpoints that change blogs, comments and author
+    images (see _sync_feed_entry); rebuild_feed.py recomputes it from scratch.
+    """
+    blog_id = db.Column(db.Integer, db.ForeignKey('blog.id'), primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    snippet = db.Column(db.String(200), nullable=False)
+    image_url = db.Column(db.String(300), nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    pub_date = db.Column(db.DateTime, nullable=False)
+    author_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    author_name = db.Column(db.String(100), nullable=False)
+    author_image_url = db.Column(db.String(300), nullable=True)
+    comment_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_feed_entry_pub_date_blog_id', 'pub_date', 'blog_id'),
+        db.Index('ix_feed_entry_category_pub_date_blog_id', 'category', 'pub_date', 'blog_id'),
+        db.Index('ix_feed_entry_updated_at', 'updated_at'),
+        db.Index('ix_feed_entry_author_id', 'author_id'),
+    )
+
+class ListingVersion(db.Model):
+    """Version of one home-page listing: 'all' or a single category.
+
+    Every change to the feed rows a listing shows bumps it in the same
+    transaction (see _invalidate_listings), so get_blogs builds its ETag from
+    one primary-key lookup however many blogs there are.
+    """
+    listing = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+class RevokedToken(db.Model):
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class MediaJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # 'upload' or 'delete'
+    target_type = db.Column(db.String(20), nullable=True)  # 'blog', 'pending_blog' or 'user'
+    target_id = db.Column(db.Integer, nullable=True)
+    folder = db.Column(db.String(100), nullable=True)
+    staged_path = db.Column(db.String(500), nullable=True)
+    public_id = db.Column(db.String(200), nullable=True)
+    public_ids = db.Column(db.Text, nullable=True)  # JSON list; batched deletes
+    replaces_public_id = db.Column(db.String(200), nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_media_job_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+# --- Auth State ---
+def _principal(user):
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "user_type": user.user_type,
+        "profile_image_url": user.profile_image_url
+    }
+
+def _load_principal(user_id):
+    user = db.session.get(User, int(user_id))
+    return _principal(user) if user else None
+
+@jwt.token_in_blocklist_loader
+def _is_token_revoked(jwt_header, jwt_payload):
+    return token_denylist.contains(jwt_payload['jti'])
+
+def _issue_tokens(principal):
+    claims = {'role': principal['user_type']}
+    return {
+        "access_token": create_access_token(identity=str(principal['id']), additional_claims=claims),
+        "refresh_token": create_refresh_token(identity=str(principal['id']), additional_claims=claims)
+    }
+
+# --- Helper Functions ---
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+SNIPPET_LENGTH = 100
+
+def _parse_limit(raw_limit):
+    try:
+        limit = int(raw_limit) if raw_limit else DEFAULT_PAGE_SIZE
+    except ValueError:
+        return None
+    if limit < 1:
+        return None
+    return min(limit, MAX_PAGE_SIZE)
+
+def _encode_cursor(*values):
+    raw = '|'.join(str(value) for value in values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def _decode_cursor(cursor, *types):
+    """Returns the typed values of an opaque cursor, or None if it is malformed."""
     try:
-        cloudinary.uploader.destroy(public_id)
-        print(f"Successfully deleted from Cloudinary: {public_id}")
-    except Exception as e:
-        print(f"Error deleting from Cloudinary {public_id}: {e}")
+        padded = cursor + '=' * (-len(cursor) % 4)
+        parts = base64.urlsafe_b64decode(padded).decode().split('|')
+        if len(parts) != len(types):
+            return None
+        return tuple(parse(part) for parse, part in zip(types, parts))
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def _comments_page(blog_id, limit, cursor=None):
+    """Returns (comments, next_cursor) for a blog, newest first, or None for a bad cursor."""
+    query = db.session.query(
+        Comment.id, Comment.content, Comment.pub_date, Comment.user_id,
+        User.name.label('commenter_name'),
+        func.coalesce(User.profile_image_thumb_url, User.profile_image_url).label('commenter_image_url')
+    ).join(User, Comment.user_id == User.id).filter(Comment.blog_id == blog_id)
+    if cursor:
+        position = _decode_cursor(cursor, datetime.fromisoformat, int)
+        if position is None:
+            return None
+        cursor_date, cursor_id = position
+        query = query.filter(db.or_(
+            Comment.pub_date < cursor_date,
+            db.and_(Comment.pub_date == cursor_date, Comment.id < cursor_id)
+        ))
+    rows = query.order_by(Comment.pub_date.desc(), Comment.id.desc()).limit(limit + 1).all()
+    next_cursor = _encode_cursor(rows[limit - 1].pub_date.isoformat(), rows[limit - 1].id) if len(rows) > limit else None
+    return COMMENT.many(rows[:limit]), next_cursor
+
+def _listing_key(category):
+    return category if category and category.lower() != 'all' else 'all'
+
+def _listing_namespace(category):
+    return f"blog-list:{_listing_key(category)}"
+
+def _detail_namespace(blog_id):
+    return f"blog:{blog_id}"
+
+def _invalidate_listings(*categories):
+    """Moves the full listing and these categories' listings to a new version; the caller commits."""
+    listings = sorted({'all', *[_listing_key(category) for category in categories]})
+    for listing in listings:
+        bump = update(ListingVersion).where(ListingVersion.listing == listing) \
+            .values(version=ListingVersion.version + 1).execution_options(synchronize_session=False)
+        if db.session.execute(bump).rowcount:
+            continue
+        try:
+            with db.session.begin_nested():
+                db.session.add(ListingVersion(listing=listing, version=1))
+        except IntegrityError:
+            # A concurrent request created the row first.
+            db.session.execute(bump)
+    response_cache.invalidate(*[_listing_namespace(listing) for listing in listings])
+
+def _serve_cached(namespace, key, build_response):
+    """Returns the cached JSON body for (namespace, key), building and storing it on a miss.
+
+    Callers put the response's ETag in the key: the ETag comes from the live
+    database while the cache is per process, so a worker that missed an
+    invalidation must not serve its old body under the new ETag.
+    """
+    body, version = response_cache.get(namespace, key)
+    if body is not None:
+        return current_app.response_class(body, mimetype='application/json')
+    response = current_app.make_response(build_response())
+    if response.status_code == 200:
+        response_cache.set(namespace, key, response.get_data(), version)
+    return response
+
+def _touch_blogs(blog_ids):
+    """Bumps updated_at so conditional GETs of these blogs stop matching."""
+    if blog_ids:
+        Blog.query.filter(Blog.id.in_(blog_ids)).update({Blog.updated_at: datetime.utcnow()}, synchronize_session=False)
+
+def _make_etag(*version):
+    return hashlib.blake2b(repr(version).encode(), digest_size=12).hexdigest()
+
+def _conditional_get(etag, last_modified, build_response):
+    """Answers 304 when the client already has this version, otherwise builds the response.
+
+    The body is only built on a mismatch, so a revalidation costs a single
+    version lookup.
+    """
+    if request.if_none_match:
+        not_modified = etag in request.if_none_match
+    else:
+        not_modified = bool(last_modified and request.if_modified_since
+                            and last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None))
+    response = current_app.response_class(status=304) if not_modified else current_app.make_response(build_response())
+    if response.status_code in (200, 304):
+        response.set_etag(etag)
+        if last_modified:
+            response.last_modified = last_modified
+        # Browsers always revalidate; a shared cache may serve it for CDN_MAX_AGE.
+        response.cache_control.public = True
+        if current_app.config['CDN_MAX_AGE']:
+            response.cache_control.max_age = 0
+            response.cache_control.s_maxage = current_app.config['CDN_MAX_AGE']
+        else:
+            response.cache_control.no_cache = True
+    return response
+
+def _refresh_user_blogs(user_id):
+    """Re-versions every blog detail that embeds this user's profile image."""
+    authored_ids = db.session.query(Blog.id).filter(Blog.user_id == user_id)
+    commented_ids = db.session.query(Comment.blog_id).filter(Comment.user_id == user_id)
+    affected_blog_ids = [blog_id for (blog_id,) in authored_ids.union(commented_ids)]
+    _touch_blogs(affected_blog_ids)
+    return affected_blog_ids
+
+def _sync_feed_entry(blog):
+    """Creates or refreshes a blog's feed row from the blog and its author; the caller commits."""
+    author = blog.author
+    values = dict(
+        title=blog.title, snippet=blog.content[:SNIPPET_LENGTH],
+        image_url=blog.image_thumb_url or blog.image_url, category=blog.category, pub_date=blog.pub_date,
+        author_id=author.id, author_name=author.name,
+        author_image_url=author.profile_image_thumb_url or author.profile_image_url,
+        updated_at=datetime.utcnow()
+    )
+    entry = db.session.get(FeedEntry, blog.id)
+    if entry is None:
+        comment_count = db.session.query(func.count(Comment.id)).filter(Comment.blog_id == blog.id).scalar()
+        db.session.add(FeedEntry(blog_id=blog.id, comment_count=comment_count, **values))
+    else:
+        for name, value in values.items():
+            setattr(entry, name, value)
+
+def _adjust_comment_count(blog_id, delta):
+    """Shifts a feed row's comment count in SQL and returns the blog's category; the caller commits."""
+    FeedEntry.query.filter(FeedEntry.blog_id == blog_id).update(
+        {FeedEntry.comment_count: FeedEntry.comment_count + delta, FeedEntry.updated_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+    return db.session.query(FeedEntry.category).filter(FeedEntry.blog_id == blog_id).scalar()
+
+def _refresh_feed_author(user):
+    """Copies a user's current profile image into their feed rows; the caller commits."""
+    FeedEntry.query.filter(FeedEntry.author_id == user.id).update(
+        {FeedEntry.author_image_url: user.profile_image_thumb_url or user.profile_image_url,
+         FeedEntry.updated_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+    return [category for (category,) in db.session.query(FeedEntry.category).filter(FeedEntry.author_id == user.id).distinct()]
+
+def _insert_feed_entries(blog_ids=None):
+    """Builds feed rows for the given blogs (every blog if None) in one INSERT ... SELECT; the caller commits."""
+    comment_counts = db.session.query(
+        Comment.blog_id, func.count(Comment.id).label('comment_count')
+    ).group_by(Comment.blog_id).subquery()
+    rows = db.session.query(
+        Blog.id, Blog.title, func.substr(Blog.content, 1, SNIPPET_LENGTH),
+        func.coalesce(Blog.image_thumb_url, Blog.image_url), Blog.category, Blog.pub_date,
+        User.id, User.name, func.coalesce(User.profile_image_thumb_url, User.profile_image_url),
+        func.coalesce(comment_counts.c.comment_count, 0), Blog.updated_at
+    ).join(User, Blog.user_id == User.id).outerjoin(comment_counts, comment_counts.c.blog_id == Blog.id)
+    if blog_ids is not None:
+        rows = rows.filter(Blog.id.in_(blog_ids))
+    db.session.execute(insert(FeedEntry).from_select([
+        'blog_id', 'title', 'snippet', 'image_url', 'category', 'pub_date',
+        'author_id', 'author_name', 'author_image_url', 'comment_count', 'updated_at'
+    ], rows))
+
+def rebuild_feed():
+    """Recomputes every feed row from blogs, users and comments; the caller commits."""
+    FeedEntry.query.delete(synchronize_session=False)
+    _insert_feed_entries()
+    _invalidate_listings(*[category for (category,) in db.session.query(FeedEntry.category).distinct()],
+                         *[listing for (listing,) in db.session.query(ListingVersion.listing)])
+
+def _receive_upload(file_field, required_fields, validate):
+    return receive_upload(request, file_field, current_app.config['MEDIA_STAGING_DIR'], required_fields, validate)
+
+def _enqueue_upload(staged_path, target_type, target_id, folder, replaces_public_id=None):
+    """Queues the upload of an already-staged file; the caller commits."""
+    job = MediaJob(
+        kind='upload', target_type=target_type, target_id=target_id, folder=folder,
+        staged_path=staged_path,
+        replaces_public_id=replaces_public_id or None
+    )
+    db.session.add(job)
+    db.session.flush()
+    return job
+
+def _enqueue_delete(*public_ids):
+    """Queues removal of hosted images and their variants, batched per job; the caller commits."""
+    asset_ids = [asset_id for public_id in public_ids if public_id for asset_id in all_variant_public_ids(public_id)]
+    for start in range(0, len(asset_ids), DELETE_BATCH_SIZE):
+        db.session.add(MediaJob(kind='delete', public_ids=json.dumps(asset_ids[start:start + DELETE_BATCH_SIZE])))
+
+def _media_target(job):
+    model = {'blog': Blog, 'pending_blog': PendingBlog, 'user': User}[job.target_type]
+    return db.session.get(model, job.target_id)
+
+def _public_ids_in_use(public_ids):
+    """The subset of images a live row still shows (uploads are content-addressed, so rows can share one)."""
+    return {public_id for query in [
+        db.session.query(Blog.image_public_id).filter(Blog.image_public_id.in_(public_ids)),
+        db.session.query(PendingBlog.image_public_id).filter(PendingBlog.image_public_id.in_(public_ids), PendingBlog.status == 'pending'),
+        db.session.query(User.profile_image_public_id).filter(User.profile_image_public_id.in_(public_ids)),
+    ] for (public_id,) in query}
+
+def _run_media_job(job):
+    if job.kind == 'delete':
+        # Jobs queued before deletes were batched carry a single public_id.
+        asset_ids = json.loads(job.public_ids) if job.public_ids else [job.public_id]
+        in_use = _public_ids_in_use({base_public_id(asset_id) for asset_id in asset_ids})
+        media_storage.destroy_many([asset_id for asset_id in asset_ids if base_public_id(asset_id) not in in_use])
+        return
+
+    # Resize/recompress locally so only the smaller variants are uploaded.
+    variant_paths = run_native(process_image, job.staged_path)
+    # Name assets after the original's content so re-uploads map to the same URLs.
+    base_id = file_digest(job.staged_path)
+    urls = {}
+    for variant, path in variant_paths.items():
+        result = media_storage.upload(path, job.folder, public_id=variant_public_id(base_id, variant))
+        urls[variant] = result['secure_url']
+        if variant == 'full':
+            job.public_id = result['public_id']
+
+    target = _media_target(job)
+    affected_blog_ids, affected_categories = [], []
+    if target is None:
+        # The blog/submission/user went away while the upload was queued.
+        _enqueue_delete(job.public_id)
+    elif job.target_type == 'user':
+        target.profile_image_url = urls['full']
+        target.profile_image_thumb_url = urls.get('thumb')
+        target.profile_image_card_url = urls.get('card')
+        target.profile_image_public_id = job.public_id
+        target.profile_image_status = 'ready'
+        affected_blog_ids = _refresh_user_blogs(target.id)
+        affected_categories = _refresh_feed_author(target)
+        principal_cache.invalidate(target.id)
+    else:
+        target.image_url = urls['full']
+        target.image_thumb_url = urls.get('thumb')
+        target.image_card_url = urls.get('card')
+        target.image_public_id = job.public_id
+        target.image_status = 'ready'
+        if job.target_type == 'blog':
+            _sync_feed_entry(target)
+            affected_blog_ids, affected_categories = [target.id], [target.category]
+    if target is not None:
+        _enqueue_delete(job.replaces_public_id)
+    if affected_categories:
+        _invalidate_listings(*affected_categories)
+    db.session.commit()
+
+    for path in [job.staged_path, *variant_paths_for(job.staged_path)]:
+        if os.path.exists(path):
+            os.remove(path)
+    response_cache.invalidate(*[_detail_namespace(blog_id) for blog_id in affected_blog_ids])
+    media_worker.wake()
+
+def _fail_media_job(job):
+    if job.kind != 'upload':
+        return
+    target = _media_target(job)
+    if target is not None:
+        if job.target_type == 'user':
+            target.profile_image_status = 'failed'
+        else:
+            target.image_status = 'failed'
+    if job.staged_path:
+        for path in [job.staged_path, *variant_paths_for(job.staged_path)]:
+            if os.path.exists(path):
+                os.remove(path)
+
+@api.before_app_request
+def _start_media_worker():
+    if current_app.config['MEDIA_WORKER_THREADS'] > 0:
+        media_worker.start()
+
+@api.before_app_request
+def _warn_unused_forwarded_for():
+    # Login rate limits and replica stickiness key on remote_addr. Behind a
+    # proxy with PROXY_FIX_HOPS=0 that is the proxy's address, so every
+    # client would share one bucket; say so once per process.
+    if current_app.config['PROXY_FIX_HOPS'] or 'X-Forwarded-For' not in request.headers:
+        return
+    if not current_app.extensions.get('warned_forwarded_for'):
+        current_app.extensions['warned_forwarded_for'] = True
+        current_app.logger.warning(
+            "Request carries X-Forwarded-For but PROXY_FIX_HOPS=0, so client IPs are the proxy's (%s). "
+            "Set PROXY_FIX_HOPS to the number of proxies in front of the app.", request.remote_addr)
 
 # --- API ENDPOINTS ---
-@app.route('/')
+@api.route('/')
 def index():
     return jsonify({"status": "Backend server is running!"})
 
 # --- User & Profile Endpoints ---
-@app.route('/api/user/profile-image', methods=['POST'])
+@api.route('/api/user/profile-image', methods=['POST'])
+@jwt_required()
 def upload_profile_image():
-    user_id = request.form.get('userId')
-    file = request.files.get('profileImage')
-    if not all([user_id, file]):
-        return jsonify({"message": "User ID and image file are required."}), 400
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"message": "User not found."}), 404
-    
-    if user.profile_image_public_id:
-        _delete_from_cloudinary(user.profile_image_public_id)
-        
-    upload_result = cloudinary.uploader.upload(file, folder="blog_profiles")
-    user.profile_image_url = upload_result['secure_url']
-    user.profile_image_public_id = upload_result['public_id']
+    user_id = int(get_jwt_identity())
+    def validate(fields, has_file):
+        if not has_file:
+            return "An image file is required.", 400
+        if not principal_cache.get(user_id):
+            return "User not found.", 404
+
+    fields, staged_path, error = _receive_upload('profileImage', [], validate)
+    if error:
+        return jsonify({"message": error[0]}), error[1]
+    user = db.session.get(User, user_id)
     
+    # The old image is only removed once the new one is live.
+    job = _enqueue_upload(staged_path, 'user', user.id, "blog_profiles", replaces_public_id=user.profile_image_public_id)
+    user.profile_image_status = 'pending'
     db.session.commit()
+    media_worker.wake()
     return jsonify({
-        "message": "Profile image updated successfully.",
-        "profile_image_url": user.profile_image_url
-    }), 200
+        "message": "Profile image is being processed.",
+        "profile_image_url": user.profile_image_url,
+        "image_status": user.profile_image_status,
+        "media_job_id": job.id
+    }), 202
 
 # --- Guest Author Endpoints ---
-@app.route('/api/author/my-posts/<int:author_id>', methods=['GET'])
+@api.route('/api/author/my-posts/<int:author_id>', methods=['GET'])
 def get_my_posts(author_id):
-    posts = PendingBlog.query.filter_by(user_id=author_id).order_by(PendingBlog.submitted_date.desc()).all()
-    output = [{
-        'id': post.id,
-        'title': post.title,
-        'status': post.status,
-        'rejection_reason': post.rejection_reason,
-        'submitted_date': post.submitted_date.strftime('%d %B %Y')
-    } for post in posts]
-    return jsonify({'my_posts': output})
-
-@app.route('/api/author/my-posts/<int:post_id>', methods=['DELETE'])
+    posts = db.session.query(
+        PendingBlog.id, PendingBlog.title, PendingBlog.status, PendingBlog.rejection_reason,
+        PendingBlog.submitted_date, PendingBlog.blog_id
+    ).filter(PendingBlog.user_id == author_id).order_by(PendingBlog.submitted_date.desc()).all()
+    return jsonify({'my_posts': MY_POST.many(posts)})
+
+@api.route('/api/author/my-posts/<int:post_id>', methods=['DELETE'])
+@jwt_required()
 def delete_author_post(post_id):
     post_to_delete = PendingBlog.query.get_or_404(post_id)
-    user_id_from_request = request.get_json().get('userId')
 
-    if post_to_delete.user_id != int(user_id_from_request):
+    if post_to_delete.user_id != int(get_jwt_identity()):
         return jsonify({"message": "You are not authorized to delete this post."}), 403
 
-    _delete_from_cloudinary(post_to_delete.image_public_id)
+    _enqueue_delete(post_to_delete.image_public_id)
     
     db.session.delete(post_to_delete)
     db.session.commit()
+    media_worker.wake()
     return jsonify({"message": "Your submission has been successfully deleted."}), 200
 
 # --- Blog Submission & Management Endpoints ---
-@app.route('/api/blogs/submit', methods=['POST'])
+@api.route('/api/blogs/submit', methods=['POST'])
+@jwt_required()
 def submit_blog():
-    file = request.files.get('image')
-    title = request.form.get('title')
-    content = request.form.get('content')
-    user_id = request.form.get('userId')
-    category = request.form.get('category', 'General')
-    
-    if not all([file, title, content, user_id]):
-        return jsonify({"message": "All fields including an image are required."}), 400
-    
-    upload_result = cloudinary.uploader.upload(file, folder="blog_images")
+    user_id = int(get_jwt_identity())
+    def validate(fields, has_file):
+        if not all([has_file, fields.get('title'), fields.get('content')]):
+            return "All fields including an image are required.", 400
+        if not principal_cache.get(user_id):
+            return "User not found.", 404
+
+    fields, staged_path, error = _receive_upload('image', ['title', 'content'], validate)
+    if error:
+        return jsonify({"message": error[0]}), error[1]
+    title, content = fields['title'], fields['content']
+    category = fields.get('category', 'General')
     
     new_pending_blog = PendingBlog(
         title=title, 
         content=content, 
-        image_public_id=upload_result['public_id'], 
-        image_url=upload_result['secure_url'],
+        image_public_id='', 
+        image_url='',
+        image_status='pending',
         user_id=user_id, 
         category=category
     )
     db.session.add(new_pending_blog)
+    db.session.flush()
+    job = _enqueue_upload(staged_path, 'pending_blog', new_pending_blog.id, "blog_images")
     db.session.commit()
-    return jsonify({"message": "Blog submitted successfully for review."}), 201
+    media_worker.wake()
+    return jsonify({"message": "Blog submitted successfully for review.", "media_job_id": job.id}), 201
 
 # --- Admin Endpoints ---
-@app.route('/api/admin/blogs/create', methods=['POST'])
+@api.route('/api/admin/blogs/create', methods=['POST'])
+@role_required('Admin')
 def admin_create_blog():
-    file = request.files.get('image')
-    title = request.form.get('title')
-    content = request.form.get('content')
-    user_id = request.form.get('userId')
-    category = request.form.get('category', 'General')
-
-    if not all([file, title, content, user_id]):
-        return jsonify({"message": "All fields including an image are required."}), 400
-    
-    user = User.query.get(user_id)
-    if not user or user.user_type != 'Admin':
-        return jsonify({"message": "Only admins can create blogs directly."}), 403
-    
-    upload_result = cloudinary.uploader.upload(file, folder="blog_images")
+    def validate(fields, has_file):
+        if not all([has_file, fields.get('title'), fields.get('content')]):
+            return "All fields including an image are required.", 400
+
+    fields, staged_path, error = _receive_upload('image', ['title', 'content'], validate)
+    if error:
+        return jsonify({"message": error[0]}), error[1]
+    title, content, user_id = fields['title'], fields['content'], int(get_jwt_identity())
+    category = fields.get('category', 'General')
     
     new_blog = Blog(
         title=title, 
         content=content, 
-        image_url=upload_result['secure_url'], 
-        image_public_id=upload_result['public_id'],
+        image_url='', 
+        image_public_id='',
+        image_status='pending',
         user_id=user_id, 
         category=category
     )
     db.session.add(new_blog)
+    db.session.flush()
+    _sync_feed_entry(new_blog)
+    job = _enqueue_upload(staged_path, 'blog', new_blog.id, "blog_images")
+    _invalidate_listings(new_blog.category)
     db.session.commit()
-    return jsonify({"message": "Blog created and published successfully."}), 201
+    media_worker.wake()
+    return jsonify({"message": "Blog created and published successfully.", "media_job_id": job.id}), 201
 
-@app.route('/api/admin/pending-blogs', methods=['GET'])
+@api.route('/api/admin/pending-blogs', methods=['GET'])
+@role_required('Admin')
 def get_pending_blogs():
-    pending_list = PendingBlog.query.filter_by(status='pending').order_by(PendingBlog.submitted_date.asc()).all()
-    return jsonify({'pending_blogs': [{'id': p.id, 'title': p.title, 'author_name': p.author.name, 'submitted_date': p.submitted_date.strftime('%d %B %Y')} for p in pending_list]})
+    pending_list = db.session.query(
+        PendingBlog.id, PendingBlog.title, User.name.label('author_name'), PendingBlog.submitted_date
+    ).join(User, PendingBlog.user_id == User.id).filter(PendingBlog.status == 'pending') \
+        .order_by(PendingBlog.submitted_date.asc()).all()
+    return jsonify({'pending_blogs': PENDING_LISTING.many(pending_list)})
 
-@app.route('/api/admin/pending-blogs/<int:pending_id>', methods=['GET'])
+@api.route('/api/admin/pending-blogs/<int:pending_id>', methods=['GET'])
+@role_required('Admin')
 def get_single_pending_blog(pending_id):
-    pending_blog = PendingBlog.query.get_or_404(pending_id)
-    return jsonify({
-        'id': pending_blog.id,
-        'title': pending_blog.title,
-        'content': pending_blog.content,
-        'image_url': pending_blog.image_url,
-        'category': pending_blog.category,
-        'author_name': pending_blog.author.name,
-        'author_image_url': pending_blog.author.profile_image_url,
-        'submitted_date': pending_blog.submitted_date.strftime('%d %B %Y')
-    })
+    # An approved submission's content is read from the blog it was published as.
+    published = PendingBlog.blog_id.isnot(None)
+    pending_blog = db.session.query(
+        PendingBlog.id, PendingBlog.title,
+        db.case((published, Blog.content), else_=PendingBlog.content).label('content'),
+        db.case((published, Blog.image_url), else_=PendingBlog.image_url).label('image_url'),
+        db.case((published, Blog.image_status), else_=PendingBlog.image_status).label('image_status'),
+        PendingBlog.category, PendingBlog.status, PendingBlog.blog_id, User.name.label('author_name'),
+        User.profile_image_url.label('author_image_url'), PendingBlog.submitted_date
+    ).join(User, PendingBlog.user_id == User.id).outerjoin(Blog, PendingBlog.blog_id == Blog.id) \
+        .filter(PendingBlog.id == pending_id).first()
+    if pending_blog is None:
+        abort(404)
+    return jsonify(PENDING_DETAIL.one(pending_blog))
 
-@app.route('/api/admin/blogs/approve/<int:pending_id>', methods=['POST'])
-def approve_blog(pending_id):
-    pending_blog = PendingBlog.query.get_or_404(pending_id)
-    new_blog = Blog(
-        title=pending_blog.title, 
-        content=pending_blog.content, 
-        image_url=pending_blog.image_url, 
-        image_public_id=pending_blog.image_public_id,
-        user_id=pending_blog.user_id, 
-        category=pending_blog.category
+MAX_MODERATION_BATCH = 200
+
+def _approve_pending(pending_ids):
+    """Publishes pending submissions with one INSERT ... SELECT; the caller commits.
+
+    Returns ({pending_id: result}, categories of the new blogs). A result is
+    'approved', 'not_found', 'not_pending' or 'image_not_ready'.
+    """
+    results = {pending_id: 'not_found' for pending_id in pending_ids}
+    eligible = []
+    for row in db.session.query(PendingBlog.id, PendingBlog.status, PendingBlog.image_status).filter(PendingBlog.id.in_(pending_ids)):
+        if row.status != 'pending':
+            results[row.id] = 'not_pending'
+        elif row.image_status != 'ready':
+            results[row.id] = 'image_not_ready'
+        else:
+            eligible.append(row.id)
+    if not eligible:
+        return results, []
+
+    # Flipping the status first claims the rows, so concurrent approvals can't publish one twice.
+    claimed = [pending_id for (pending_id,) in db.session.execute(
+        update(PendingBlog).where(PendingBlog.id.in_(eligible), PendingBlog.status == 'pending')
+        .values(status='approved').returning(PendingBlog.id),
+        execution_options={'synchronize_session': False}
+    )]
+    for pending_id in eligible:
+        results[pending_id] = 'approved' if pending_id in claimed else 'not_pending'
+    if not claimed:
+        return results, []
+
+    now = datetime.utcnow()
+    source = db.select(
+        PendingBlog.title, PendingBlog.content, PendingBlog.image_url, PendingBlog.image_public_id,
+        PendingBlog.image_thumb_url, PendingBlog.image_card_url, literal('ready'), PendingBlog.category,
+        literal(now, db.DateTime), literal(now, db.DateTime), PendingBlog.user_id
+    ).where(PendingBlog.id.in_(claimed)).order_by(PendingBlog.id)
+    new_blogs = sorted(db.session.execute(insert(Blog).from_select([
+        'title', 'content', 'image_url', 'image_public_id', 'image_thumb_url', 'image_card_url',
+        'image_status', 'category', 'pub_date', 'updated_at', 'user_id'
+    ], source).returning(Blog.id, Blog.category)).all())
+    _insert_feed_entries([blog_id for blog_id, _ in new_blogs])
+
+    # New ids are assigned in the SELECT's ORDER BY order (the same assumption
+    # SQLAlchemy's own bulk inserts make), so sorted ids pair up with sorted
+    # submission ids. Each submission then drops its copy of the content.
+    pending_table = PendingBlog.__table__
+    db.session.execute(
+        update(pending_table).where(pending_table.c.id == bindparam('submission_id')).values(
+            blog_id=bindparam('published_id'), content='', image_url='', image_public_id='',
+            image_thumb_url=None, image_card_url=None
+        ),
+        [{'submission_id': pending_id, 'published_id': blog_id}
+         for pending_id, (blog_id, _) in zip(sorted(claimed), new_blogs)]
     )
-    db.session.add(new_blog)
-    pending_blog.status = 'approved' 
+    return results, sorted({category for _, category in new_blogs})
+
+def _reject_pending(pending_ids):
+    """Removes pending submissions and queues their images for deletion; the caller commits.
+
+    Returns {pending_id: result}, a result being 'rejected', 'not_found' or 'not_pending'.
+    """
+    results = {pending_id: 'not_found' for pending_id in pending_ids}
+    for (pending_id,) in db.session.query(PendingBlog.id).filter(PendingBlog.id.in_(pending_ids)):
+        results[pending_id] = 'not_pending'
+    removed = db.session.execute(
+        delete(PendingBlog).where(PendingBlog.id.in_(pending_ids), PendingBlog.status == 'pending')
+        .returning(PendingBlog.id, PendingBlog.image_public_id),
+        execution_options={'synchronize_session': False}
+    ).all()
+    for pending_id, _ in removed:
+        results[pending_id] = 'rejected'
+    _enqueue_delete(*[public_id for _, public_id in removed])
+    return results
+
+def _moderation_ids(data):
+    """Validates the "ids" list of a bulk moderation request; returns (ids, error message)."""
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return None, "ids must be a non-empty list of submission ids."
+    if len(ids) > MAX_MODERATION_BATCH:
+        return None, f"At most {MAX_MODERATION_BATCH} submissions can be moderated at once."
+    return list(dict.fromkeys(ids)), None
+
+def purge_moderated_submissions(older_than):
+    """Deletes approved submissions sent before `older_than`; the caller commits.
+
+    Their images belong to the published blogs, which are untouched. Rejected
+    submissions are deleted when they are rejected, so none are left to purge.
+    Returns the number of submissions removed.
+    """
+    return db.session.execute(
+        delete(PendingBlog).where(PendingBlog.status == 'approved', PendingBlog.submitted_date < older_than),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+
+@api.route('/api/admin/blogs/approve/<int:pending_id>', methods=['POST'])
+@role_required('Admin')
+def approve_blog(pending_id):
+    results, categories = _approve_pending([pending_id])
+    result = results[pending_id]
+    if result == 'not_found':
+        abort(404)
+    if result == 'image_not_ready':
+        return jsonify({"message": "The submission's image is still being processed."}), 409
+    if result == 'not_pending':
+        return jsonify({"message": "This submission has already been moderated."}), 409
+    _invalidate_listings(*categories)
     db.session.commit()
     return jsonify({"message": "Blog has been approved and published."}), 200
 
-@app.route('/api/admin/blogs/reject/<int:pending_id>', methods=['POST'])
+@api.route('/api/admin/blogs/approve', methods=['POST'])
+@role_required('Admin')
+def bulk_approve_blogs():
+    ids, error = _moderation_ids(request.get_json(silent=True) or {})
+    if error:
+        return jsonify({"message": error}), 400
+    results, categories = _approve_pending(ids)
+    if categories:
+        _invalidate_listings(*categories)
+    db.session.commit()
+    approved = sum(result == 'approved' for result in results.values())
+    return jsonify({
+        "message": f"{approved} of {len(ids)} submissions approved and published.",
+        "results": [{"id": pending_id, "result": results[pending_id]} for pending_id in ids]
+    }), 200
+
+@api.route('/api/admin/blogs/reject/<int:pending_id>', methods=['POST'])
+@role_required('Admin')
 def reject_blog(pending_id):
-    pending_blog = PendingBlog.query.get_or_404(pending_id)
     reason = request.get_json().get('reason')
     if not reason:
         return jsonify({"message": "Rejection reason is required."}), 400
-    
-    _delete_from_cloudinary(pending_blog.image_public_id)
-    
-    db.session.delete(pending_blog)
+    result = _reject_pending([pending_id])[pending_id]
+    if result == 'not_found':
+        abort(404)
+    if result == 'not_pending':
+        return jsonify({"message": "This submission has already been moderated."}), 409
     db.session.commit()
+    media_worker.wake()
     return jsonify({"message": "Blog has been rejected and the submission removed."}), 200
 
+@api.route('/api/admin/blogs/reject', methods=['POST'])
+@role_required('Admin')
+def bulk_reject_blogs():
+    data = request.get_json(silent=True) or {}
+    ids, error = _moderation_ids(data)
+    if error:
+        return jsonify({"message": error}), 400
+    if not data.get('reason'):
+        return jsonify({"message": "Rejection reason is required."}), 400
+    results = _reject_pending(ids)
+    db.session.commit()
+    media_worker.wake()
+    rejected = sum(result == 'rejected' for result in results.values())
+    return jsonify({
+        "message": f"{rejected} of {len(ids)} submissions rejected.",
+        "results": [{"id": pending_id, "result": results[pending_id]} for pending_id in ids]
+    }), 200
+
+@api.route('/api/admin/cache-stats', methods=['GET'])
+@role_required('Admin')
+def get_cache_stats():
+    return jsonify(response_cache.stats())
+
+@api.route('/api/admin/pool-stats', methods=['GET'])
+@role_required('Admin')
+def get_pool_stats():
+    return jsonify({
+        "profile": current_app.config['DB_PROFILE'],
+        "engines": {name: engine.pool_metrics.stats(engine.pool) for name, engine in db_engines.items()},
+    })
+
+def _collect_cache_metrics():
+    stats = response_cache.stats()
+    return [
+        '# HELP response_cache_requests_total Response cache lookups by result.',
+        '# TYPE response_cache_requests_total counter',
+        f'response_cache_requests_total{{result="hit"}} {stats["hits"]}',
+        f'response_cache_requests_total{{result="miss"}} {stats["misses"]}',
+    ]
+
+def _collect_pool_metrics():
+    stats = {(name,): engine.pool_metrics.stats(engine.pool) for name, engine in db_engines.items()}
+    buckets = PoolMetrics.BUCKETS
+    series = {key: ([data['wait_seconds_buckets'][str(bound)] for bound in buckets] + [data['wait_seconds_buckets']['+Inf']],
+                    data['wait_seconds_total'])
+              for key, data in stats.items()}
+    lines = render_histogram('db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection.',
+                             series, buckets, ('engine',))
+    lines += [
+        '# HELP db_pool_checkout_timeouts_total Checkouts that gave up waiting for a connection.',
+        '# TYPE db_pool_checkout_timeouts_total counter',
+    ]
+    lines += [f'db_pool_checkout_timeouts_total{{engine="{name}"}} {data["timeouts"]}' for (name,), data in stats.items()]
+    in_use = [(name, data['checked_out']) for (name,), data in stats.items() if 'checked_out' in data]
+    if in_use:
+        lines += [
+            '# HELP db_pool_connections_checked_out Connections currently in use.',
+            '# TYPE db_pool_connections_checked_out gauge',
+        ]
+        lines += [f'db_pool_connections_checked_out{{engine="{name}"}} {count}' for name, count in in_use]
+    return lines
+
+@api.route('/metrics', methods=['GET'])
+def get_metrics():
+    token = current_app.config['METRICS_TOKEN']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return jsonify({"message": "Metrics token required."}), 401
+    return metrics_registry.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+# --- Media Endpoints ---
+MEDIA_MAX_AGE = 365 * 24 * 3600
+
+@api.route('/media/<path:asset_path>', methods=['GET'])
+def serve_media(asset_path):
+    """Serves locally stored media; names are content-addressed so responses are immutable."""
+    if current_app.config['MEDIA_BACKEND'] != 'local':
+        abort(404)
+    if current_app.config['MEDIA_ACCEL_REDIRECT']:
+        # nginx serves the file (with sendfile and Range) from its internal location.
+        if '..' in asset_path.split('/'):
+            abort(404)
+        response = current_app.response_class()
+        response.headers['X-Accel-Redirect'] = current_app.config['MEDIA_ACCEL_REDIRECT'].rstrip('/') + '/' + asset_path
+        response.headers.remove('Content-Type')
+    else:
+        # send_file hands the file to the server's wsgi.file_wrapper (sendfile
+        # under gunicorn) and answers Range/conditional requests itself.
+        response = send_from_directory(current_app.config['MEDIA_ROOT'], asset_path, conditional=True, max_age=MEDIA_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.max_age = MEDIA_MAX_AGE
+    response.cache_control.immutable = True
+    return response
+
+# --- Media Job Endpoints ---
+@api.route('/api/media-jobs/<int:job_id>', methods=['GET'])
+def get_media_job(job_id):
+    job = MediaJob.query.get_or_404(job_id)
+    output = {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'attempts': job.attempts,
+        'last_error': job.last_error,
+        'image_url': None
+    }
+    if job.status == 'done' and job.kind == 'upload':
+        target = _media_target(job)
+        if target is not None:
+            output['image_url'] = target.profile_image_url if job.target_type == 'user' else target.image_url
+    return jsonify(output)
+
 # --- Public Blog & Comment Endpoints ---
-@app.route('/api/blogs', methods=['GET'])
+@api.route('/api/blogs', methods=['GET'])
 def get_blogs():
+    category = request.args.get('category', '')
+    key = '|'.join(request.args.get(arg, '') for arg in ('q', 'limit', 'cursor'))
+
+    # Collection version: every change to the listing's feed rows bumps it.
+    listing = _listing_key(category)
+    version = db.session.query(ListingVersion.version).filter(ListingVersion.listing == listing).scalar() or 0
+    etag = _make_etag('blogs', listing, key, version)
+    return _conditional_get(etag, None, lambda: _serve_cached(_listing_namespace(category), f'{key}|{etag}', _build_blogs_listing))
+
+def _build_blogs_listing():
     search_term = request.args.get('q', '')
     category = request.args.get('category', '')
-    query = Blog.query
-    if search_term:
-        query = query.filter(Blog.title.ilike(f'%{search_term}%'))
+    limit = _parse_limit(request.args.get('limit'))
+    if limit is None:
+        return jsonify({"message": "limit must be a positive integer."}), 400
+
+    # The feed table holds every listing column, so a page is one index scan
+    # without joins; only a search also touches the blog table.
+    query = db.session.query(
+        FeedEntry.blog_id.label('id'), FeedEntry.title, FeedEntry.snippet, FeedEntry.image_url,
+        FeedEntry.pub_date, FeedEntry.category, FeedEntry.author_name, FeedEntry.author_image_url,
+        FeedEntry.comment_count
+    )
     if category and category.lower() != 'all':
-        query = query.filter_by(category=category)
-    blogs = query.order_by(Blog.pub_date.desc()).all()
-    return jsonify({'blogs': [{'id': blog.id, 'title': blog.title, 'content_snippet': blog.content[:100] + '...','image_url': blog.image_url,'pub_date': blog.pub_date.strftime('%d %B %Y'), 'author_name': blog.author.name, 'category': blog.category} for blog in blogs]})
+        query = query.filter(FeedEntry.category == category)
+
+    cursor = request.args.get('cursor')
+    ranking = None
+    if search_term:
+        query = query.join(Blog, Blog.id == FeedEntry.blog_id)
+        query, ranking = apply_search(query, Blog, search_term, db.engine.dialect.name)
 
-@app.route('/api/blogs/<int:blog_id>', methods=['GET'])
+    if ranking is not None:
+        # Relevance-ranked results have no stable sort key to seek on, so
+        # search pages are addressed by offset instead of (pub_date, id).
+        offset = 0
+        if cursor:
+            position = _decode_cursor(cursor, int)
+            if position is None:
+                return jsonify({"message": "Invalid cursor."}), 400
+            offset = position[0]
+        rows = query.order_by(*ranking).offset(offset).limit(limit + 1).all()
+        next_cursor = _encode_cursor(offset + limit) if len(rows) > limit else None
+    else:
+        if cursor:
+            position = _decode_cursor(cursor, datetime.fromisoformat, int)
+            if position is None:
+                return jsonify({"message": "Invalid cursor."}), 400
+            cursor_date, cursor_id = position
+            query = query.filter(db.or_(
+                FeedEntry.pub_date < cursor_date,
+                db.and_(FeedEntry.pub_date == cursor_date, FeedEntry.blog_id < cursor_id)
+            ))
+        rows = query.order_by(FeedEntry.pub_date.desc(), FeedEntry.blog_id.desc()).limit(limit + 1).all()
+        next_cursor = _encode_cursor(rows[limit - 1].pub_date.isoformat(), rows[limit - 1].id) if len(rows) > limit else None
+    rows = rows[:limit]
+    return jsonify({'blogs': BLOG_LISTING.many(rows), 'next_cursor': next_cursor})
+
+@api.route('/api/blogs/<int:blog_id>', methods=['GET'])
 def get_single_blog(blog_id):
-    blog = Blog.query.get_or_404(blog_id)
-    comments_output = sorted(
-        [{
-            'id': c.id, 'content': c.content, 'pub_date': c.pub_date.strftime('%d %B %Y'), 
-            'commenter_name': c.commenter.name, 'commenter_id': c.commenter.id, 
-            'commenter_image_url': c.commenter.profile_image_url
-        } for c in blog.comments],
-        key=lambda c: c['pub_date'], reverse=True
-    )
+    updated_at = db.session.query(Blog.updated_at).filter(Blog.id == blog_id).scalar()
+    if updated_at is None:
+        abort(404)
+    etag = _make_etag('blog', blog_id, updated_at)
+    return _conditional_get(etag, updated_at, lambda: _serve_cached(_detail_namespace(blog_id), f'detail|{etag}', lambda: _build_single_blog(blog_id)))
+
+def _build_single_blog(blog_id):
+    blog = db.session.query(
+        Blog.id, Blog.title, Blog.content, Blog.image_url,
+        func.coalesce(func.nullif(Blog.image_card_url, ''), Blog.image_url).label('image_card_url'), Blog.image_status,
+        Blog.category, Blog.pub_date, User.name.label('author_name'), User.profile_image_url.label('author_image_url')
+    ).join(User, Blog.user_id == User.id).filter(Blog.id == blog_id).first()
+    if blog is None:
+        abort(404)
+    comment_count = db.session.query(func.count(Comment.id)).filter(Comment.blog_id == blog_id).scalar()
+    comments, comments_next_cursor = _comments_page(blog_id, DEFAULT_PAGE_SIZE)
     return jsonify({
-        'id': blog.id, 'title': blog.title, 'content': blog.content, 
-        'image_url': blog.image_url, 'category': blog.category,
-        'pub_date': blog.pub_date.strftime('%d %B %Y'), 'author_name': blog.author.name, 
-        'author_image_url': blog.author.profile_image_url,
-        'comments': comments_output
+        **BLOG_DETAIL.one(blog),
+        'comment_count': comment_count,
+        'comments': comments,
+        'comments_next_cursor': comments_next_cursor
     })
 
-@app.route('/api/blogs/<int:blog_id>', methods=['PUT'])
-def update_blog(blog_id):
-    user_id = request.form.get('adminUserId')
-    user = User.query.get(user_id)
-    if not user or user.user_type != 'Admin':
-        return jsonify({"message": "You are not authorized to perform this action."}), 403
+@api.route('/api/blogs/<int:blog_id>/comments', methods=['GET'])
+def get_blog_comments(blog_id):
+    updated_at = db.session.query(Blog.updated_at).filter(Blog.id == blog_id).scalar()
+    if updated_at is None:
+        abort(404)
+    key = '|'.join(request.args.get(arg, '') for arg in ('limit', 'cursor'))
+    etag = _make_etag('comments', blog_id, key, updated_at)
+    return _conditional_get(etag, updated_at, lambda: _serve_cached(_detail_namespace(blog_id), f'comments|{key}|{etag}', lambda: _build_comments_page(blog_id)))
 
+def _build_comments_page(blog_id):
+    limit = _parse_limit(request.args.get('limit'))
+    if limit is None:
+        return jsonify({"message": "limit must be a positive integer."}), 400
+    page = _comments_page(blog_id, limit, request.args.get('cursor'))
+    if page is None:
+        return jsonify({"message": "Invalid cursor."}), 400
+    comments, next_cursor = page
+    return jsonify({'comments': comments, 'next_cursor': next_cursor})
+
+@api.route('/api/blogs/<int:blog_id>', methods=['PUT'])
+@role_required('Admin')
+def update_blog(blog_id):
     blog = Blog.query.get_or_404(blog_id)
-    blog.title = request.form.get('title', blog.title)
-    blog.content = request.form.get('content', blog.content)
-    blog.category = request.form.get('category', blog.category)
+    fields, staged_path, error = _receive_upload('image', [], lambda fields, has_file: None)
+    if error:
+        return jsonify({"message": error[0]}), error[1]
+
+    old_category = blog.category
+    blog.title = fields.get('title', blog.title)
+    blog.content = fields.get('content', blog.content)
+    blog.category = fields.get('category', blog.category)
     
-    if 'image' in request.files and request.files['image'].filename != '':
-        _delete_from_cloudinary(blog.image_public_id)
-        
-        file = request.files['image']
-        upload_result = cloudinary.uploader.upload(file, folder="blog_images")
-        blog.image_url = upload_result['secure_url']
-        blog.image_public_id = upload_result['public_id']
-        
+    job = None
+    if staged_path:
+        # The current image stays up until the replacement is live.
+        job = _enqueue_upload(staged_path, 'blog', blog.id, "blog_images", replaces_public_id=blog.image_public_id)
+        blog.image_status = 'pending'
+    _sync_feed_entry(blog)
+    _invalidate_listings(old_category, blog.category)
     db.session.commit()
-    return jsonify({"message": "Blog updated successfully."}), 200
+    if job:
+        media_worker.wake()
+    response_cache.invalidate(_detail_namespace(blog.id))
+    return jsonify({"message": "Blog updated successfully.", "media_job_id": job.id if job else None}), 200
 
-@app.route('/api/blogs/<int:blog_id>', methods=['DELETE'])
+@api.route('/api/blogs/<int:blog_id>', methods=['DELETE'])
+@role_required('Admin')
 def delete_blog(blog_id):
-    user_id = request.get_json().get('adminUserId')
-    user = User.query.get(user_id)
-    if not user or user.user_type != 'Admin':
-        return jsonify({"message": "You are not authorized to perform this action."}), 403
-
     blog = Blog.query.get_or_404(blog_id)
     
-    if blog.image_public_id:
-        _delete_from_cloudinary(blog.image_public_id)
+    _enqueue_delete(blog.image_public_id)
             
+    category = blog.category
+    FeedEntry.query.filter(FeedEntry.blog_id == blog_id).delete(synchronize_session=False)
+    PendingBlog.query.filter(PendingBlog.blog_id == blog_id).update({PendingBlog.blog_id: None}, synchronize_session=False)
     db.session.delete(blog)
+    _invalidate_listings(category)
     db.session.commit()
+    media_worker.wake()
+    response_cache.invalidate(_detail_namespace(blog_id))
     return jsonify({'message': 'Blog deleted successfully'}), 200
 
-@app.route('/api/blogs/<int:blog_id>/comments', methods=['POST'])
+@api.route('/api/blogs/<int:blog_id>/comments', methods=['POST'])
+@jwt_required()
 def add_comment(blog_id):
-    data = request.get_json()
-    content, user_id = data.get('content'), data.get('userId')
-    if not all([content, user_id]):
-        return jsonify({"message": "Comment content and user ID are required."}), 400
+    content, user_id = (request.get_json(silent=True) or {}).get('content'), int(get_jwt_identity())
+    if not content:
+        return jsonify({"message": "Comment content is required."}), 400
     db.session.add(Comment(content=content, user_id=user_id, blog_id=blog_id))
+    _touch_blogs([blog_id])
+    category = _adjust_comment_count(blog_id, 1)
+    if category:
+        _invalidate_listings(category)
     db.session.commit()
+    response_cache.invalidate(_detail_namespace(blog_id))
     return jsonify({"message": "Comment added successfully."}), 201
 
-@app.route('/api/comments/<int:comment_id>', methods=['DELETE'])
+@api.route('/api/comments/<int:comment_id>', methods=['DELETE'])
+@jwt_required()
 def delete_comment(comment_id):
-    user_id = request.get_json().get('userId')
     comment = Comment.query.get_or_404(comment_id)
-    if comment.user_id != int(user_id):
+    if comment.user_id != int(get_jwt_identity()):
         return jsonify({"message": "You are not authorized to delete this comment."}), 403
+    blog_id = comment.blog_id
     db.session.delete(comment)
+    _touch_blogs([blog_id])
+    category = _adjust_comment_count(blog_id, -1)
+    if category:
+        _invalidate_listings(category)
     db.session.commit()
+    response_cache.invalidate(_detail_namespace(blog_id))
     return jsonify({"message": "Comment deleted successfully."}), 200
 
 # --- Authentication Endpoints ---
-@app.route('/api/signup', methods=['POST'])
+def _too_many_attempts(retry_after):
+    response = jsonify({"message": "Too many attempts. Please try again later."})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 429
+
+def _hasher_busy():
+    response = jsonify({"message": "The server is busy. Please try again shortly."})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+@api.route('/api/signup', methods=['POST'])
 def signup():
     data = request.get_json()
     name, email, password, confirm_password, user_type = data.get('name'), data.get('email'), data.get('password'), data.get('confirmPassword'), data.get('userType')
@@ -360,29 +1326,53 @@ def signup():
         return jsonify({"message": "All fields are required."}), 400
     if password != confirm_password:
         return jsonify({"message": "Passwords do not match."}), 400
+    retry_after = login_ip_limiter.hit(f'ip:{request.remote_addr}')
+    if retry_after:
+        return _too_many_attempts(retry_after)
     if User.query.filter_by(email=email).first():
         return jsonify({"message": "This email is already registered."}), 409
     
+    try:
+        password_hash = password_hasher.hash(password)
+    except HasherBusy:
+        return _hasher_busy()
     new_user = User(
         name=name,
         email=email,
-        password_hash=generate_password_hash(password),
+        password_hash=password_hash,
         user_type=user_type
     )
     db.session.add(new_user)
     db.session.commit()
     return jsonify({"message": "Account created successfully!"}), 201
 
-@app.route('/api/login', methods=['POST'])
+@api.route('/api/login', methods=['POST'])
 def unified_login():
-    data = request.get_json()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"message": "Email and password are required."}), 400
     email = data.get('email')
     password = data.get('password')
     login_type = data.get('loginType')
+    if not isinstance(email, str) or not isinstance(password, str):
+        return jsonify({"message": "Email and password are required."}), 400
+    if not email or not password:
+        return jsonify({"message": "Invalid email or password."}), 401
 
-    user = User.query.filter_by(email=email).first()
+    retry_after = (login_ip_limiter.hit(f'ip:{request.remote_addr}')
+                   or login_email_limiter.hit(f'email:{email.strip().lower()}'))
+    if retry_after:
+        return _too_many_attempts(retry_after)
 
-    if not user or not check_password_hash(user.password_hash, password):
+    user = User.query.filter_by(email=email).first()
+    try:
+        matches, needs_rehash = password_hasher.verify(user.password_hash if user else None, password)
+        if matches and needs_rehash:
+            user.password_hash = password_hasher.hash(password)
+            db.session.commit()
+    except HasherBusy:
+        return _hasher_busy()
+    if not matches:
         return jsonify({"message": "Invalid email or password."}), 401
 
     expected_user_type = {
@@ -394,17 +1384,39 @@ def unified_login():
     if not expected_user_type or user.user_type != expected_user_type:
         return jsonify({"message": "Access denied for this role."}), 403
     
-    user_data = {
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "user_type": user.user_type,
-        "profile_image_url": user.profile_image_url
-    }
-    return jsonify({"message": "Login successful!", "user": user_data}), 200
+    user_data = _principal(user)
+    return jsonify({"message": "Login successful!", "user": user_data, **_issue_tokens(user_data)}), 200
+
+@api.route('/api/token/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh_token():
+    # Re-read the role so a demoted user doesn't keep admin access past one access token.
+    principal = principal_cache.get(get_jwt_identity())
+    if not principal:
+        return jsonify({"message": "User not found."}), 401
+    access_token = create_access_token(identity=str(principal['id']), additional_claims={'role': principal['user_type']})
+    return jsonify({"access_token": access_token}), 200
+
+@api.route('/api/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    token = get_jwt()
+    token_denylist.revoke(token['jti'], datetime.utcfromtimestamp(token['exp']))
+    # The client may also hand over its refresh token so both die together.
+    refresh = (request.get_json(silent=True) or {}).get('refreshToken')
+    if refresh:
+        try:
+            refresh_claims = decode_token(refresh)
+        except Exception:
+            return jsonify({"message": "Invalid refresh token."}), 400
+        if refresh_claims['sub'] != token['sub']:
+            return jsonify({"message": "Invalid refresh token."}), 400
+        token_denylist.revoke(refresh_claims['jti'], datetime.utcfromtimestamp(refresh_claims['exp']))
+    db.session.commit()
+    return jsonify({"message": "Logged out successfully."}), 200
 
 
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
-    app.run(debug=True, port=5000)
+    # Development server; create or upgrade the schema first with `python migrations.py`.
+    os.environ.setdefault('FLASK_DEBUG', '1')
+    create_app().run(port=5000)
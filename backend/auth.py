@@ -0,0 +1,86 @@
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+
+from flask import jsonify
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+
+from cache import InProcessBackend
+
+# Token-based auth helpers. Access tokens carry the user's role in a 'role'
+# claim, so role checks need no database lookup; the few handlers that need
+# the whole user row go through PrincipalCache.
+
+
+def role_required(role):
+    """Rejects the request unless it carries a valid access token for `role`."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            if get_jwt().get('role') != role:
+                return jsonify({"message": "You are not authorized to perform this action."}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class PrincipalCache:
+    """Short-lived cache of user rows as plain dicts, keyed by user id."""
+
+    def __init__(self, load_user, ttl=60, max_entries=4096):
+        self.load_user = load_user
+        self.ttl = ttl
+        self._backend = InProcessBackend(max_entries)
+
+    def get(self, user_id):
+        key = str(user_id)
+        principal = self._backend.get(key)
+        if principal is None:
+            principal = self.load_user(user_id)
+            if principal is not None:
+                self._backend.set(key, principal, self.ttl)
+        return principal
+
+    def invalidate(self, user_id):
+        self._backend.delete(str(user_id))
+
+
+class TokenDenylist:
+    """Revoked token ids, persisted in a table and mirrored in memory.
+
+    Only unexpired entries are kept, so the set stays as small as the
+    number of tokens revoked within one token lifetime. Other processes
+    pick up a revocation on their next refresh (every `refresh_interval`
+    seconds); the revoking process sees it at once.
+    """
+
+    def __init__(self, db, model, refresh_interval=5):
+        self.db = db
+        self.model = model
+        self.refresh_interval = refresh_interval
+        self._jtis = set()
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        now = datetime.utcnow()
+        rows = self.db.session.query(self.model.jti).filter(self.model.expires_at > now).all()
+        with self._lock:
+            self._jtis = {jti for (jti,) in rows}
+            self._loaded_at = time.monotonic()
+
+    def contains(self, jti):
+        if time.monotonic() - self._loaded_at > self.refresh_interval:
+            self._refresh()
+        return jti in self._jtis
+
+    def revoke(self, jti, expires_at):
+        """Adds a token id and prunes expired entries; the caller commits."""
+        Model = self.model
+        Model.query.filter(Model.expires_at <= datetime.utcnow()).delete(synchronize_session=False)
+        if not self.db.session.get(Model, jti):
+            self.db.session.add(Model(jti=jti, expires_at=expires_at))
+        with self._lock:
+            self._jtis.add(jti)
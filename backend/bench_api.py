@@ -0,0 +1,471 @@
+# bench_api.py
+# Load-tests every API endpoint on a synthetic corpus and saves the results
+# as JSON so runs on different commits can be compared. Builds the corpus
+# with generate_data.py in a throwaway SQLite database (or reuses --database,
+# which must already hold a generated corpus), replaces Cloudinary with an
+# in-process fake that answers after FAKE_CLOUDINARY_LATENCY_MS, then runs
+# each scenario for SECONDS with CONCURRENCY client threads, either through
+# the Flask test client or over HTTP against a real gunicorn (configured by
+# gunicorn.conf.py). BENCH_DB_LATENCY_MS adds a delay to every SQL statement
+# to stand in for the network round trip to a database server.
+#
+#   python bench_api.py [--mode client|gunicorn] [--scale small|medium|large]
+#                       [--seconds 5] [--concurrency 4] [--only feed,search]
+#                       [--worker-class gthread] [--workers N] [--threads 4]
+#                       [--output result.json]
+#   python bench_api.py --compare before.json after.json [--tolerance 0.10]
+#
+# Read scenarios run before write scenarios; the login rate limits are
+# switched off so the login scenario measures password hashing.
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from io import BytesIO
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PORT = 5057
+SCALES = {
+    # users, blogs, comments, pending submissions
+    'small': (1_000, 5_000, 20_000, 2_000),
+    'medium': (10_000, 100_000, 500_000, 10_000),
+    'large': (100_000, 1_000_000, 5_000_000, 50_000),
+}
+SEARCH_TERMS = ['solar', 'morning coffee', 'climate', 'startup design', 'python data']
+
+
+# --- Fake Cloudinary ---
+def install_fake_cloudinary(latency):
+    """Answers Cloudinary upload/delete calls locally after `latency` seconds."""
+    import cloudinary.api
+    import cloudinary.uploader
+
+    def upload(path, folder=None, public_id=None, **options):
+        time.sleep(latency)
+        public_id = f'{folder}/{public_id or uuid.uuid4().hex}'
+        return {'public_id': public_id, 'secure_url': f'https://res.cloudinary.example/bench/{public_id}'}
+
+    def destroy(public_id, **options):
+        time.sleep(latency)
+        return {'result': 'ok'}
+
+    def delete_resources(public_ids, **options):
+        time.sleep(latency)
+        return {'deleted': {public_id: 'deleted' for public_id in public_ids}}
+
+    cloudinary.uploader.upload = cloudinary.uploader.upload_large = upload
+    cloudinary.uploader.destroy = destroy
+    cloudinary.api.delete_resources = delete_resources
+
+
+def install_db_latency(engine, latency):
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def delay(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(latency)
+
+
+def bench_app():
+    """gunicorn entry point: 'bench_api:bench_app()'."""
+    install_fake_cloudinary(float(os.environ.get('FAKE_CLOUDINARY_LATENCY_MS', 50)) / 1000)
+    from app import create_app, db
+    app = create_app()
+    db_latency = float(os.environ.get('BENCH_DB_LATENCY_MS', 0)) / 1000
+    if db_latency:
+        with app.app_context():
+            install_db_latency(db.engine, db_latency)
+    return app
+
+
+# --- Requests ---
+def json_request(method, path, body=None, token=None):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    if body is None:
+        return method, path, headers, None
+    headers['Content-Type'] = 'application/json'
+    return method, path, headers, json.dumps(body).encode()
+
+
+def multipart_request(method, path, fields, image, token=None):
+    boundary = uuid.uuid4().hex
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+             for name, value in fields.items()]
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="image"; filename="bench.png"\r\n'
+                 f'Content-Type: image/png\r\n\r\n'.encode() + image + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    headers = {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    return method, path, headers, b''.join(parts)
+
+
+def sample_image():
+    from PIL import Image
+    buffer = BytesIO()
+    Image.new('RGB', (1200, 800), (90, 140, 200)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class TestClientTransport:
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def __call__(self, method, path, headers, body):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, headers=headers, data=body)
+        payload = response.get_data()
+        response.close()
+        return response.status_code, payload
+
+
+class HttpTransport:
+    def __call__(self, method, path, headers, body):
+        connection = http.client.HTTPConnection('127.0.0.1', PORT, timeout=60)
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+
+# --- Scenarios ---
+class Corpus:
+    """Ids and tokens the scenarios pick from."""
+
+    def __init__(self, send, accounts, blog_ids, pending_ids, comments):
+        self.accounts = accounts
+        self.blog_ids = blog_ids
+        self.pending_ids = pending_ids
+        self.tokens, self.refresh_tokens = {}, {}
+        for key, role in (('admin', 'admin'), ('guest', 'guest'), ('reader', 'user')):
+            email = f'{key}@bench.example.com'
+            status, payload = send(*json_request('POST', '/api/login', {
+                'email': email, 'password': 'bench-password', 'loginType': role}))
+            if status != 200:
+                raise SystemExit(f"Could not log in as {email}: {status} {payload[:200]!r}")
+            tokens = json.loads(payload)
+            self.tokens[key], self.refresh_tokens[key] = tokens['access_token'], tokens['refresh_token']
+        self.comments = iter(comments)
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def blog_id(self, rng):
+        # Like the comments, reads favour recent posts.
+        return self.blog_ids[len(self.blog_ids) - 1 - int(len(self.blog_ids) * rng.random() ** 3)]
+
+    def take(self, iterator):
+        """Next item of a shared iterator, or None once it is exhausted."""
+        with self._lock:
+            return next(iterator, None)
+
+    def unique(self):
+        with self._lock:
+            self._counter += 1
+            return self._counter
+
+
+def scenarios(corpus, image):
+    admin, guest, reader = corpus.tokens['admin'], corpus.tokens['guest'], corpus.tokens['reader']
+    guest_id = corpus.accounts['guest']
+
+    # Moderation consumes submissions, so each moderation scenario gets its own share of them.
+    queues = [iter(corpus.pending_ids[n::4]) for n in range(4)]
+
+    def comment_delete(rng):
+        comment = corpus.take(corpus.comments)
+        return comment and json_request('DELETE', f'/api/comments/{comment[0]}', token=comment[1])
+
+    def moderate(action, queue):
+        def build(rng):
+            pending_id = corpus.take(queue)
+            body = {'reason': 'Benchmark rejection.'} if action == 'reject' else None
+            return pending_id and json_request('POST', f'/api/admin/blogs/{action}/{pending_id}', body, admin)
+        return build
+
+    def bulk_moderate(action, queue):
+        def build(rng):
+            ids = [pending_id for pending_id in (corpus.take(queue) for _ in range(20)) if pending_id]
+            body = {'ids': ids, **({'reason': 'Benchmark rejection.'} if action == 'reject' else {})}
+            return ids and json_request('POST', f'/api/admin/blogs/{action}', body, admin)
+        return build
+
+    reads = {
+        'index': lambda rng: json_request('GET', '/'),
+        'feed': lambda rng: json_request('GET', '/api/blogs'),
+        'feed_category': lambda rng: json_request('GET', f'/api/blogs?category={rng.choice(["Tech", "News", "Food"])}'),
+        'feed_large_page': lambda rng: json_request('GET', '/api/blogs?limit=100'),
+        'search': lambda rng: json_request('GET', f'/api/blogs?q={rng.choice(SEARCH_TERMS).replace(" ", "+")}'),
+        'blog_detail': lambda rng: json_request('GET', f'/api/blogs/{corpus.blog_id(rng)}'),
+        'blog_comments': lambda rng: json_request('GET', f'/api/blogs/{corpus.blog_id(rng)}/comments'),
+        'my_posts': lambda rng: json_request('GET', f'/api/author/my-posts/{guest_id}', token=guest),
+        'pending_queue': lambda rng: json_request('GET', '/api/admin/pending-blogs', token=admin),
+        'pending_detail': lambda rng: json_request('GET', f'/api/admin/pending-blogs/{rng.choice(corpus.pending_ids)}', token=admin),
+        'cache_stats': lambda rng: json_request('GET', '/api/admin/cache-stats', token=admin),
+        'pool_stats': lambda rng: json_request('GET', '/api/admin/pool-stats', token=admin),
+        'metrics': lambda rng: json_request('GET', '/metrics'),
+    }
+    writes = {
+        'login': lambda rng: json_request('POST', '/api/login', {
+            'email': 'reader@bench.example.com', 'password': 'bench-password', 'loginType': 'user'}),
+        'signup': lambda rng: json_request('POST', '/api/signup', {
+            'name': 'Bench Signup', 'email': f'signup-{uuid.uuid4().hex}@bench.example.com',
+            'password': 'bench-password', 'confirmPassword': 'bench-password', 'userType': 'Normal User'}),
+        'token_refresh': lambda rng: json_request('POST', '/api/token/refresh', token=corpus.refresh_tokens['reader']),
+        'add_comment': lambda rng: json_request('POST', f'/api/blogs/{corpus.blog_id(rng)}/comments', {
+            'content': 'Benchmark comment.'}, reader),
+        'delete_comment': comment_delete,
+        'submit_blog': lambda rng: multipart_request('POST', '/api/blogs/submit', {
+            'title': 'Benchmark submission', 'content': 'Benchmark content. ' * 50, 'category': 'Tech'}, image, guest),
+        'admin_create_blog': lambda rng: multipart_request('POST', '/api/admin/blogs/create', {
+            'title': 'Benchmark post', 'content': 'Benchmark content. ' * 50, 'category': 'News'}, image, admin),
+        'update_blog': lambda rng: multipart_request('PUT', f'/api/blogs/{corpus.blog_id(rng)}', {
+            'title': f'Benchmark edit {corpus.unique()}'}, image, admin),
+        'approve': moderate('approve', queues[0]),
+        'reject': moderate('reject', queues[1]),
+        'bulk_approve': bulk_moderate('approve', queues[2]),
+        'bulk_reject': bulk_moderate('reject', queues[3]),
+    }
+    return reads, writes
+
+
+# --- Runner ---
+def percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000, 3)
+
+
+def run_scenario(send, build, seconds, concurrency, seed):
+    stop = time.monotonic() + seconds
+    latencies, statuses, errors = [], Counter(), []
+    exhausted = threading.Event()
+    lock = threading.Lock()
+
+    def client(n):
+        rng = random.Random(seed * 1000 + n)
+        while time.monotonic() < stop:
+            prepared = build(rng)
+            if not prepared:
+                exhausted.set()  # the scenario ran out of rows to work on
+                return
+            start = time.perf_counter()
+            try:
+                status, _ = send(*prepared)
+            except Exception as error:
+                with lock:
+                    errors.append(repr(error))
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'throughput': round(len(latencies) / elapsed, 2),
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'exhausted': exhausted.is_set(),
+    }
+
+
+def git_revision():
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=HERE, capture_output=True, text=True).stdout.strip()
+    commit = git('rev-parse', 'HEAD') or 'unknown'
+    return commit, bool(git('status', '--porcelain', '--untracked-files=no'))
+
+
+def start_gunicorn(env, worker_class, workers=None, threads=None):
+    env = dict(env, WEB_WORKER_CLASS=worker_class, BIND=f'127.0.0.1:{PORT}')
+    if workers:
+        env['WEB_CONCURRENCY'] = str(workers)
+    if threads:
+        env['WEB_THREADS'] = str(threads)
+    command = [sys.executable, '-m', 'gunicorn', 'bench_api:bench_app()', '--log-level', 'warning']
+    server = subprocess.Popen(command, cwd=HERE, env=env)
+    for _ in range(150):
+        try:
+            HttpTransport()('GET', '/', {}, None)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise SystemExit("gunicorn did not start")
+
+
+def load_corpus_ids(db, Blog, PendingBlog, Comment):
+    from flask_jwt_extended import create_access_token
+    blog_ids = [row[0] for row in db.session.query(Blog.id).order_by(Blog.id)]
+    pending_ids = [row[0] for row in db.session.query(PendingBlog.id).filter_by(status='pending').order_by(PendingBlog.id)]
+    # Only its author may delete a comment, so each comes with a token for the commenter.
+    comments = db.session.query(Comment.id, Comment.user_id).order_by(Comment.id.desc()).limit(100_000).all()
+    tokens = {user_id: create_access_token(identity=str(user_id), additional_claims={'role': 'Normal User'})
+              for user_id in {user_id for _, user_id in comments}}
+    return blog_ids, pending_ids, [(comment_id, tokens[user_id]) for comment_id, user_id in comments]
+
+
+def run(args):
+    scale = SCALES[args.scale]
+    database = args.database or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_api.db')
+    os.environ['DATABASE_URL'] = database
+    os.environ['LOGIN_IP_BURST'] = os.environ['LOGIN_EMAIL_BURST'] = '0'
+    os.environ.setdefault('FAKE_CLOUDINARY_LATENCY_MS', '50')
+    os.environ.setdefault('JWT_SECRET_KEY', 'bench-only-secret')
+    server_env = dict(os.environ)
+    if args.mode == 'gunicorn':
+        # The benchmark process only prepares data; gunicorn's workers run the media jobs.
+        os.environ['MEDIA_WORKER_THREADS'] = '0'
+    install_fake_cloudinary(float(os.environ['FAKE_CLOUDINARY_LATENCY_MS']) / 1000)
+
+    from app import create_app, db, User, Blog, Comment, PendingBlog
+    from generate_data import ACCOUNTS, generate
+    from migrations import upgrade
+
+    app = create_app()
+    with app.app_context():
+        upgrade()
+        if not User.query.first():
+            generate(*scale, seed=args.seed)
+        accounts = {key: User.query.filter_by(email=email).one().id for key, (email, _) in ACCOUNTS.items()}
+        blog_ids, pending_ids, comments = load_corpus_ids(db, Blog, PendingBlog, Comment)
+        counts = {model.__tablename__: db.session.query(model).count() for model in (User, Blog, Comment, PendingBlog)}
+        db.session.remove()
+
+    server = None
+    if args.mode == 'gunicorn':
+        server = start_gunicorn(server_env, args.worker_class, args.workers, args.threads)
+        send = HttpTransport()
+    else:
+        db_latency = float(os.environ.get('BENCH_DB_LATENCY_MS', 0)) / 1000
+        if db_latency:
+            with app.app_context():
+                install_db_latency(db.engine, db_latency)
+        send = TestClientTransport(app)
+    try:
+        corpus = Corpus(send, accounts, blog_ids, pending_ids, comments)
+        reads, writes = scenarios(corpus, sample_image())
+        selected = {**reads, **writes}
+        if args.only:
+            selected = {name: selected[name] for name in args.only.split(',')}
+        results = {}
+        print(f"{'scenario':<20}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statuses")
+        for n, (name, build) in enumerate(selected.items()):
+            result = results[name] = run_scenario(send, build, args.seconds, args.concurrency, args.seed + n)
+            print(f"{name:<20}{result['throughput']:>10.1f}{result['p50_ms'] or 0:>10.1f}"
+                  f"{result['p95_ms'] or 0:>10.1f}{result['p99_ms'] or 0:>10.1f}  {result['statuses']}"
+                  + (f" errors: {result['errors']} ({result['first_error']})" if result['errors'] else ''))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    commit, dirty = git_revision()
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'mode': args.mode,
+        'config': {
+            'scale': args.scale, 'rows': counts, 'seed': args.seed, 'seconds': args.seconds,
+            'concurrency': args.concurrency,
+            **({'worker_class': args.worker_class, 'workers': args.workers, 'threads': args.threads}
+               if args.mode == 'gunicorn' else {}),
+            'db_latency_ms': float(os.environ.get('BENCH_DB_LATENCY_MS', 0)),
+            'database': database.split('://')[0],
+            'fake_cloudinary_latency_ms': float(os.environ['FAKE_CLOUDINARY_LATENCY_MS']),
+            'response_cache_ttl': app.config['RESPONSE_CACHE_TTL'],
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+        },
+        'scenarios': results,
+    }
+    output = args.output or os.path.join(HERE, 'bench_results', f'{commit[:10]}-{args.mode}-{args.scale}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+def compare(before_path, after_path, tolerance):
+    """Prints per-scenario changes; returns 1 if any p95 or throughput regressed beyond `tolerance`."""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+    print(f"before: {before['commit'][:10]} ({before['mode']}, {before['config']['scale']})  "
+          f"after: {after['commit'][:10]} ({after['mode']}, {after['config']['scale']})")
+    if (before['mode'], before['config']['scale']) != (after['mode'], after['config']['scale']):
+        print("warning: the runs used different modes or corpus sizes")
+    print(f"{'scenario':<20}{'req/s':>22}{'p95 ms':>24}")
+    regressed = []
+    for name in after['scenarios']:
+        old, new = before['scenarios'].get(name), after['scenarios'][name]
+        if not old or not old['requests'] or not new['requests']:
+            continue
+        throughput_change = new['throughput'] / old['throughput'] - 1
+        p95_change = new['p95_ms'] / old['p95_ms'] - 1 if old['p95_ms'] else 0.0
+        flag = ''
+        if throughput_change < -tolerance or p95_change > tolerance:
+            regressed.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<20}{old['throughput']:>9.1f} -> {new['throughput']:<8.1f}{throughput_change:>+5.0%}"
+              f"{old['p95_ms']:>10.1f} -> {new['p95_ms']:<8.1f}{p95_change:>+5.0%}{flag}")
+    if regressed:
+        print(f"{len(regressed)} scenario(s) regressed by more than {tolerance:.0%}: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the API on a synthetic corpus.")
+    parser.add_argument('--mode', choices=['client', 'gunicorn'], default='client')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--database', help="SQLAlchemy URL of an existing generated corpus to reuse")
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--worker-class', choices=['sync', 'gthread', 'gevent'], default='gthread')
+    parser.add_argument('--workers', type=int, help="default: sized by gunicorn.conf.py")
+    parser.add_argument('--threads', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', help="comma-separated scenario names")
+    parser.add_argument('--output')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    args = parser.parse_args()
+    if args.compare:
+        sys.exit(compare(*args.compare, args.tolerance))
+    run(args)
+
+
+if __name__ == '__main__':
+    main()
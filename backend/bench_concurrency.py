@@ -0,0 +1,99 @@
+# bench_concurrency.py
+# Compares how many concurrent connections each gunicorn worker class
+# sustains per CPU core on an I/O-bound workload. Serves a small generated
+# corpus through gunicorn.conf.py with every SQL statement delayed by
+# --db-latency-ms (a stand-in for the round trip to a database server) and the
+# response cache off, then steps up the number of concurrent clients reading
+# blog pages. A level counts as sustained when every request succeeds and p99
+# stays under --slo-ms; capacity is the highest sustained level per core.
+#
+#   python bench_concurrency.py [--classes sync,gthread,gevent] [--levels 8,32,64,128,256]
+#                               [--seconds 5] [--db-latency-ms 5] [--slo-ms 1000]
+#
+# The clients run on the same machine, so they compete with the server for
+# the CPU; compare classes within one run rather than across machines.
+
+import argparse
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from bench_api import (HERE, HttpTransport, git_revision, install_fake_cloudinary, json_request,
+                       run_scenario, start_gunicorn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-connection capacity per worker class.")
+    parser.add_argument('--classes', default='sync,gthread,gevent')
+    parser.add_argument('--levels', default='8,32,64,128,256')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--db-latency-ms', type=float, default=5)
+    parser.add_argument('--slo-ms', type=float, default=1000)
+    parser.add_argument('--output')
+    args = parser.parse_args()
+    levels = [int(level) for level in args.levels.split(',')]
+
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_concurrency.db')
+    os.environ.setdefault('JWT_SECRET_KEY', 'bench-only-secret')
+    server_env = dict(os.environ, MEDIA_WORKER_THREADS='0', RESPONSE_CACHE_TTL='0',
+                      BENCH_DB_LATENCY_MS=str(args.db_latency_ms))
+    os.environ['MEDIA_WORKER_THREADS'] = '0'
+    install_fake_cloudinary(0)
+    from app import create_app, db, Blog
+    from generate_data import generate
+    from migrations import upgrade
+    with create_app().app_context():
+        upgrade()
+        generate(users=200, blogs=2_000, comments=10_000, pending=100)
+        blog_ids = [row[0] for row in db.session.query(Blog.id)]
+        db.session.remove()
+
+    def read_blog(rng):
+        return json_request('GET', f'/api/blogs/{rng.choice(blog_ids)}')
+
+    cores = os.cpu_count()
+    results = {}
+    print(f"{cores} core(s), {args.db_latency_ms:g} ms per SQL statement, SLO p99 < {args.slo_ms:g} ms")
+    print(f"{'class':<9}{'clients':>8}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}  result")
+    for worker_class in args.classes.split(','):
+        server = start_gunicorn(server_env, worker_class)
+        steps, sustained = [], 0
+        try:
+            for level in levels:
+                step = run_scenario(HttpTransport(), read_blog, args.seconds, level, level)
+                failures = step['errors'] + sum(count for status, count in step['statuses'].items() if status != '200')
+                step['clients'] = level
+                step['sustained'] = not failures and step['p99_ms'] is not None and step['p99_ms'] < args.slo_ms
+                steps.append(step)
+                print(f"{worker_class:<9}{level:>8}{step['throughput']:>9.1f}{step['p50_ms'] or 0:>9.1f}"
+                      f"{step['p99_ms'] or 0:>9.1f}  {'ok' if step['sustained'] else f'{failures} failed' if failures else 'p99 over SLO'}")
+                if not step['sustained']:
+                    break
+                sustained = level
+        finally:
+            server.terminate()
+            server.wait()
+        results[worker_class] = {'sustained_clients': sustained,
+                                 'clients_per_core': round(sustained / cores, 1), 'steps': steps}
+
+    print("capacity: " + ', '.join(f"{name} {result['clients_per_core']:g} clients/core"
+                                   for name, result in results.items()))
+    commit, dirty = git_revision()
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'config': {'cores': cores, 'seconds': args.seconds, 'levels': levels,
+                   'db_latency_ms': args.db_latency_ms, 'slo_ms': args.slo_ms},
+        'classes': results,
+    }
+    output = args.output or os.path.join(HERE, 'bench_results', f'{commit[:10]}-concurrency.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
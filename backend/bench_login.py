@@ -0,0 +1,149 @@
+# bench_login.py
+# Measures login throughput and read latency while /api/login is under a
+# credential-stuffing attack. Starts the app in a threaded server subprocess
+# (throwaway SQLite DB, PROXY_FIX_HOPS=1 so each client can claim its own IP
+# via X-Forwarded-For), then runs for SECONDS each:
+#   1. legitimate logins alone,
+#   2. the same logins plus ATTACKERS threads sending wrong passwords from
+#      ATTACK_IPS rotating addresses, while a reader polls GET /api/blogs.
+#
+#   python bench_login.py [attackers] [attack_ips] [seconds]
+#
+# Run it again with e.g. LOGIN_IP_BURST=0 LOGIN_EMAIL_BURST=0 in the
+# environment to see the same attack without rate limiting.
+
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PORT = 5056
+LEGIT_CLIENTS = 4
+USERS = 20
+
+SERVER = f"""
+from app import create_app, db, User, password_hasher
+from migrations import upgrade
+app = create_app()
+with app.app_context():
+    upgrade()
+    hashed = password_hasher.hash('correct-horse')
+    for i in range({USERS}):
+        db.session.add(User(name=f'User {{i}}', email=f'user{{i}}@example.com', password_hash=hashed, user_type='Normal User'))
+    db.session.commit()
+from werkzeug.serving import run_simple
+run_simple('127.0.0.1', {PORT}, app, threaded=True)
+"""
+
+
+def request(method, path, body=None, client_ip='10.0.0.1'):
+    connection = http.client.HTTPConnection('127.0.0.1', PORT, timeout=30)
+    headers = {'X-Forwarded-For': client_ip}
+    if body is not None:
+        headers['Content-Type'] = 'application/json'
+        body = json.dumps(body)
+    start = time.perf_counter()
+    connection.request(method, path, body=body, headers=headers)
+    status = connection.getresponse().status
+    connection.close()
+    return status, time.perf_counter() - start
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return float('nan')
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+
+
+def run_phase(seconds, attackers, attack_ips):
+    stop = time.monotonic() + seconds
+    logins, reads, attack_statuses = [], [], Counter()
+    lock = threading.Lock()
+
+    def legit(n):
+        i = 0
+        while time.monotonic() < stop:
+            # Every legitimate login comes from a fresh address, like many distinct real users.
+            seq = n + i * LEGIT_CLIENTS
+            status, elapsed = request('POST', '/api/login', {
+                'email': f'user{seq % USERS}@example.com', 'password': 'correct-horse', 'loginType': 'user'
+            }, client_ip=f'10.1.{seq // 256 % 256}.{seq % 256}')
+            with lock:
+                logins.append((status, elapsed))
+            i += 1
+
+    def reader():
+        while time.monotonic() < stop:
+            status, elapsed = request('GET', '/api/blogs')
+            with lock:
+                reads.append(elapsed)
+            time.sleep(0.05)
+
+    def attacker(n):
+        i = 0
+        while time.monotonic() < stop:
+            status, _ = request('POST', '/api/login', {
+                'email': f'user{i % USERS}@example.com', 'password': f'guess{n}-{i}', 'loginType': 'user'
+            }, client_ip=f'10.2.{(n * 7919 + i) % attack_ips // 256}.{(n * 7919 + i) % attack_ips % 256}')
+            with lock:
+                attack_statuses[status] += 1
+            i += 1
+
+    threads = [threading.Thread(target=legit, args=(n,)) for n in range(LEGIT_CLIENTS)]
+    threads.append(threading.Thread(target=reader))
+    threads += [threading.Thread(target=attacker, args=(n,)) for n in range(attackers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ok = [elapsed for status, elapsed in logins if status == 200]
+    statuses = Counter(status for status, _ in logins)
+    print(f"  legit logins: {len(ok) / seconds:.1f}/s ok, p50 {percentile(ok, 0.5):.0f} ms, "
+          f"p95 {percentile(ok, 0.95):.0f} ms, statuses {dict(statuses)}")
+    print(f"  reads: {len(reads)} requests, p50 {percentile(reads, 0.5):.0f} ms, p95 {percentile(reads, 0.95):.0f} ms")
+    if attackers:
+        print(f"  attack: {sum(attack_statuses.values()) / seconds:.0f} req/s, statuses {dict(attack_statuses)}")
+
+
+def main():
+    attackers = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    attack_ips = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+    workdir = tempfile.mkdtemp()
+    env = dict(os.environ,
+               DATABASE_URL='sqlite:///' + os.path.join(workdir, 'bench.db'),
+               MEDIA_WORKER_THREADS='0',
+               RESPONSE_CACHE_TTL='0',
+               PROXY_FIX_HOPS='1')
+    # The few benchmark accounts are logged into over and over; keep the per-account buckets out of the way.
+    env.setdefault('JWT_SECRET_KEY', 'bench-only-secret')
+    env.setdefault('LOGIN_EMAIL_BURST', '1000')
+    env.setdefault('LOGIN_EMAIL_PER_MINUTE', '1000')
+    server = subprocess.Popen([sys.executable, '-c', SERVER], cwd=HERE, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        for _ in range(100):
+            try:
+                request('GET', '/api/blogs')
+                break
+            except OSError:
+                time.sleep(0.2)
+        print(f"baseline ({seconds:.0f}s):")
+        run_phase(seconds, 0, attack_ips)
+        print(f"under attack: {attackers} attackers from {attack_ips} addresses ({seconds:.0f}s):")
+        run_phase(seconds, attackers, attack_ips)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# bench_search.py
+# Compares p95 latency of the old title ILIKE search against the full-text
+# search path of GET /api/blogs on a synthetic corpus.
+#
+#   python bench_search.py [num_posts] [runs_per_term]
+#
+# Uses a throwaway SQLite database, never the one in instance/.
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+db_file = os.path.join(tempfile.mkdtemp(), 'bench_search.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + db_file
+# Measure the search itself, not repeated hits on the response cache.
+os.environ['RESPONSE_CACHE_TTL'] = '0'
+os.environ.setdefault('JWT_SECRET_KEY', 'bench-only-secret')
+
+from app import create_app, db, User, Blog, rebuild_feed
+from migrations import upgrade
+
+WORDS = ("city cities sustainable green solar energy work week remote ai assistant "
+         "morning coffee travel food health fitness market startup design music "
+         "climate ocean river mountain garden code python data cloud security").split()
+# Filler vocabulary so topic words are sparse, like real prose.
+FILLER = [f'word{i}' for i in range(5000)]
+TERMS = ['solar', 'morning coffee', 'climate', 'startup design', 'python']
+
+
+def build_corpus(num_posts):
+    rng = random.Random(42)
+    admin = User(name='Bench Admin', email='bench@example.com', password_hash='x', user_type='Admin')
+    db.session.add(admin)
+    db.session.commit()
+    batch = []
+    for i in range(num_posts):
+        batch.append({
+            'title': ' '.join(rng.choices(WORDS, k=6)).title(),
+            'content': ' '.join(rng.choices(WORDS + FILLER, k=300)),
+            'image_url': 'https://example.com/image.jpg',
+            'image_public_id': 'bench',
+            'category': rng.choice(['Tech', 'Lifestyle', 'News', 'General']),
+            'user_id': admin.id,
+        })
+        if len(batch) == 5000:
+            db.session.execute(db.insert(Blog), batch)
+            batch = []
+    if batch:
+        db.session.execute(db.insert(Blog), batch)
+    rebuild_feed()
+    db.session.commit()
+
+
+def legacy_ilike(term):
+    blogs = Blog.query.filter(Blog.title.ilike(f'%{term}%')).order_by(Blog.pub_date.desc()).all()
+    return [{'id': b.id, 'content_snippet': b.content[:100] + '...', 'author_name': b.author.name} for b in blogs]
+
+
+def p95(samples):
+    samples = sorted(samples)
+    return samples[int(len(samples) * 0.95) - 1] * 1000
+
+
+def main():
+    num_posts = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    app = create_app()
+    with app.app_context():
+        upgrade()
+        start = time.perf_counter()
+        build_corpus(num_posts)
+        print(f"Built {num_posts} posts in {time.perf_counter() - start:.1f}s")
+
+        client = app.test_client()
+        print(f"{'term':<16}{'ilike p95 ms':>14}{'fts p95 ms':>12}")
+        for term in TERMS:
+            ilike_times, fts_times = [], []
+            for _ in range(runs):
+                start = time.perf_counter()
+                legacy_ilike(term)
+                ilike_times.append(time.perf_counter() - start)
+                db.session.expunge_all()
+
+                start = time.perf_counter()
+                client.get('/api/blogs', query_string={'q': term})
+                fts_times.append(time.perf_counter() - start)
+            print(f"{term:<16}{p95(ilike_times):>14.1f}{p95(fts_times):>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# bench_serialization.py
+# Times building and encoding a 10k-row listing response three ways: the old
+# hand-built dicts with strftime per row and the stdlib encoder, the shared
+# schemas from serializers.py with the stdlib encoder, and the schemas with
+# orjson. Also compares loading the pending-submission queue as ORM objects
+# against loading column tuples.
+#
+#   python bench_serialization.py [rows] [runs]
+#
+# Uses a throwaway SQLite database, never the one in instance/.
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_serialization.db')
+os.environ['MEDIA_WORKER_THREADS'] = '0'
+os.environ.setdefault('JWT_SECRET_KEY', 'bench-only-secret')
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.orm import joinedload
+
+from app import create_app, db, User, FeedEntry, PendingBlog
+from generate_data import generate
+from migrations import upgrade
+from serializers import BLOG_LISTING, PENDING_LISTING, OrjsonProvider, orjson
+
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def legacy_listing(rows):
+    return [{'id': row.id, 'title': row.title, 'content_snippet': row.snippet + '...', 'image_url': row.image_url,
+             'pub_date': row.pub_date.strftime('%d %B %Y'), 'author_name': row.author_name,
+             'author_image_url': row.author_image_url, 'category': row.category,
+             'comment_count': row.comment_count} for row in rows]
+
+
+def main():
+    rows_wanted = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    app = create_app()
+    with app.app_context():
+        upgrade()
+        generate(users=1_000, blogs=rows_wanted, comments=rows_wanted, pending=rows_wanted)
+        rows = db.session.query(
+            FeedEntry.blog_id.label('id'), FeedEntry.title, FeedEntry.snippet, FeedEntry.image_url,
+            FeedEntry.pub_date, FeedEntry.category, FeedEntry.author_name, FeedEntry.author_image_url,
+            FeedEntry.comment_count
+        ).order_by(FeedEntry.pub_date.desc(), FeedEntry.blog_id.desc()).limit(rows_wanted).all()
+        stdlib, fast = DefaultJSONProvider(app), OrjsonProvider(app) if orjson else None
+        assert legacy_listing(rows) == BLOG_LISTING.many(rows)
+
+        print(f"\nListing of {len(rows)} rows, median of {runs} runs (ms):")
+        print(f"{'variant':<34}{'build':>8}{'encode':>8}{'total':>8}")
+        variants = [('hand-built dicts + stdlib json', legacy_listing, stdlib),
+                    ('schema + stdlib json', BLOG_LISTING.many, stdlib)]
+        if fast:
+            variants.append(('schema + orjson', BLOG_LISTING.many, fast))
+        for name, build, provider in variants:
+            payload = {'blogs': build(rows), 'next_cursor': None}
+            build_ms = timed(lambda: build(rows), runs)
+            encode_ms = timed(lambda: provider.response(payload).get_data(), runs)
+            total_ms = timed(lambda: provider.response({'blogs': build(rows), 'next_cursor': None}).get_data(), runs)
+            print(f"{name:<34}{build_ms:>8.1f}{encode_ms:>8.1f}{total_ms:>8.1f}")
+
+        def orm_queue():
+            pending = PendingBlog.query.options(joinedload(PendingBlog.author)).filter_by(status='pending') \
+                .order_by(PendingBlog.submitted_date.asc()).all()
+            result = [{'id': p.id, 'title': p.title, 'author_name': p.author.name,
+                       'submitted_date': p.submitted_date.strftime('%d %B %Y')} for p in pending]
+            db.session.expunge_all()
+            return result
+
+        def tuple_queue():
+            return PENDING_LISTING.many(db.session.query(
+                PendingBlog.id, PendingBlog.title, User.name.label('author_name'), PendingBlog.submitted_date
+            ).join(User, PendingBlog.user_id == User.id).filter(PendingBlog.status == 'pending')
+                .order_by(PendingBlog.submitted_date.asc()).all())
+
+        assert orm_queue() == tuple_queue()
+        count = len(tuple_queue())
+        print(f"\nPending queue of {count} submissions, query + build (ms):")
+        print(f"{'ORM objects + joinedload':<34}{timed(orm_queue, runs):>24.1f}")
+        print(f"{'column tuples + schema':<34}{timed(tuple_queue, runs):>24.1f}")
+
+
+if __name__ == '__main__':
+    main()
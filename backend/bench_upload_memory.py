@@ -0,0 +1,121 @@
+# bench_upload_memory.py
+# Measures server memory while many large image uploads stream in at once.
+# Starts the app in a threaded server subprocess (throwaway SQLite DB and
+# staging dir, media worker off), fires N concurrent multipart uploads of
+# SIZE MB each, and reports the server's RSS before and its peak after.
+#
+#   python bench_upload_memory.py [concurrency] [size_mb]
+
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PORT = 5055
+CHUNK = 256 * 1024
+
+SERVER = f"""
+from app import create_app, db, User
+from migrations import upgrade
+app = create_app()
+with app.app_context():
+    upgrade()
+    db.session.add(User(name='Bench', email='bench@example.com', password_hash='x', user_type='Guest Author'))
+    db.session.commit()
+from werkzeug.serving import run_simple
+run_simple('127.0.0.1', {PORT}, app, threaded=True)
+"""
+
+
+def memory_kb(pid, field):
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith(field):
+                return int(line.split()[1])
+
+
+def access_token(secret):
+    """An access token for the server's only user, signed like the server's own."""
+    from flask import Flask
+    from flask_jwt_extended import JWTManager, create_access_token
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = secret
+    JWTManager(app)
+    with app.app_context():
+        return create_access_token(identity='1', additional_claims={'role': 'Guest Author'})
+
+
+def upload(size_bytes, token, results):
+    boundary = 'benchboundary'
+    head = ''.join(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+        for name, value in [('title', 'Bench'), ('content', 'Body')]
+    ).encode() + (f'--{boundary}\r\nContent-Disposition: form-data; name="image"; filename="bench.jpg"\r\n'
+                  'Content-Type: image/jpeg\r\n\r\n').encode()
+    tail = f'\r\n--{boundary}--\r\n'.encode()
+
+    def body():
+        yield head
+        sent = 0
+        block = b'\xff' * CHUNK
+        while sent < size_bytes:
+            piece = block[:min(CHUNK, size_bytes - sent)]
+            sent += len(piece)
+            yield piece
+        yield tail
+
+    connection = http.client.HTTPConnection('127.0.0.1', PORT, timeout=120)
+    connection.request('POST', '/api/blogs/submit', body=body(), headers={
+        'Content-Type': f'multipart/form-data; boundary={boundary}',
+        'Content-Length': str(len(head) + size_bytes + len(tail)),
+        'Authorization': f'Bearer {token}',
+    })
+    results.append(connection.getresponse().status)
+    connection.close()
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    size_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    workdir = tempfile.mkdtemp()
+    env = dict(os.environ,
+               DATABASE_URL='sqlite:///' + os.path.join(workdir, 'bench.db'),
+               MEDIA_STAGING_DIR=os.path.join(workdir, 'staging'),
+               MEDIA_WORKER_THREADS='0')
+    env.setdefault('JWT_SECRET_KEY', 'bench-only-secret')
+    server = subprocess.Popen([sys.executable, '-c', SERVER], cwd=HERE, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        for _ in range(50):
+            try:
+                http.client.HTTPConnection('127.0.0.1', PORT, timeout=1).request('GET', '/')
+                break
+            except OSError:
+                time.sleep(0.2)
+        baseline = memory_kb(server.pid, 'VmRSS')
+
+        token = access_token(env['JWT_SECRET_KEY'])
+        results = []
+        threads = [threading.Thread(target=upload, args=(size_mb * 1024 * 1024, token, results)) for _ in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        peak = memory_kb(server.pid, 'VmHWM')
+        print(f"{concurrency} x {size_mb} MB uploads in {elapsed:.1f}s, statuses: {sorted(set(results))}")
+        print(f"server RSS before: {baseline / 1024:.1f} MB, peak: {peak / 1024:.1f} MB, "
+              f"growth: {(peak - baseline) / 1024:.1f} MB (payload total {concurrency * size_mb} MB)")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
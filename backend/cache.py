@@ -0,0 +1,129 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class CacheBackend:
+    """Storage interface for ResponseCache.
+
+    A shared backend (Redis, Memcached, ...) only needs these three
+    operations with per-key TTLs; it lets every gunicorn worker see the
+    same entries and the same invalidations.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+
+class InProcessBackend(CacheBackend):
+    """Thread-safe TTL + LRU cache local to one worker process.
+
+    Invalidations made in one worker are not seen by the others, so stale
+    reads there are bounded by the TTL.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class ResponseCache:
+    """Caches serialized response bodies grouped into namespaces.
+
+    Each namespace carries a version token that is part of every key in it,
+    so invalidating a namespace is a single write no matter how many
+    entries (e.g. search/cursor combinations) it holds; the orphaned
+    entries simply age out. A missing token is replaced by a fresh random
+    one, never reset, so an evicted token can't resurrect stale entries.
+    """
+
+    def __init__(self, backend, ttl=30):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _version(self, namespace):
+        version_key = f'version:{namespace}'
+        version = self.backend.get(version_key)
+        if version is None:
+            version = uuid.uuid4().hex
+            self.backend.set(version_key, version, None)
+        return version
+
+    def get(self, namespace, key):
+        """Returns (value, version); pass the version to set() when storing a miss.
+
+        Reusing the version read here means a body built before a concurrent
+        invalidation is stored under the old version, where no one reads it.
+        """
+        version = self._version(namespace)
+        value = self.backend.get(f'{namespace}:{version}:{key}')
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value, version
+
+    def set(self, namespace, key, value, version):
+        self.backend.set(f'{namespace}:{version}:{key}', value, self.ttl)
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            self.backend.set(f'version:{namespace}', uuid.uuid4().hex, None)
+
+    def stats(self):
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class NullBackend(CacheBackend):
+    """Backend that stores nothing; used when caching is disabled."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, key):
+        pass
@@ -0,0 +1,76 @@
+# check_startup.py
+# Startup time budget for cold starts. Imports app.py and calls create_app()
+# in fresh interpreters, as a new gunicorn worker does, and fails when the
+# median time is over budget, when startup loads a client that should load
+# on first use (Cloudinary, Pillow, gevent) or when it opens a database
+# connection. Run it in CI alongside the benchmarks:
+#
+#   python check_startup.py [--budget-ms 1000] [--runs 5]
+#
+# Uses the current environment's settings (DATABASE_URL, JWT_SECRET_KEY etc.).
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LAZY_MODULES = ('cloudinary', 'PIL', 'gevent')
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+connections = []
+event.listen(Pool, 'connect', lambda *args: connections.append(1))
+app.create_app()
+created = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'create_ms': (created - imported) * 1000,
+    'connections': len(connections),
+    'loaded': [name for name in {LAZY_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure():
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=HERE, capture_output=True, text=True)
+    if result.returncode:
+        sys.exit(f"Startup failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when app startup exceeds its time budget.")
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('STARTUP_BUDGET_MS', 1000)))
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [measure() for _ in range(args.runs)]
+    import_ms = statistics.median(sample['import_ms'] for sample in samples)
+    create_ms = statistics.median(sample['create_ms'] for sample in samples)
+    total_ms = statistics.median(sample['import_ms'] + sample['create_ms'] for sample in samples)
+    print(f"import app {import_ms:.0f} ms, create_app {create_ms:.0f} ms, "
+          f"total {total_ms:.0f} ms (median of {args.runs}, budget {args.budget_ms:.0f} ms)")
+
+    problems = []
+    if total_ms > args.budget_ms:
+        problems.append(f"startup took {total_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    loaded = sorted({name for sample in samples for name in sample['loaded']})
+    if loaded:
+        problems.append(f"startup imported {', '.join(loaded)}; load these on first use")
+    if any(sample['connections'] for sample in samples):
+        problems.append("create_app opened a database connection")
+    if problems:
+        sys.exit('FAIL: ' + '; '.join(problems))
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Helpers for gunicorn's gevent worker (WEB_WORKER_CLASS=gevent). That
+# worker monkey-patches the standard library, so threading.Thread starts
+# greenlets: CPU-heavy work such as the password KDF or image resizing would
+# run on the event loop and stall every connection the worker holds. These
+# helpers send that work to real OS threads when gevent is active and behave
+# like plain threads and calls otherwise.
+
+
+def gevent_active():
+    # Only a process that imported gevent.monkey can be patched; don't import gevent to find out.
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('threading')
+
+
+def native_executor(max_workers, thread_name_prefix=''):
+    if gevent_active():
+        from gevent.threadpool import ThreadPoolExecutor as GeventThreadPoolExecutor
+        return GeventThreadPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+
+
+def run_native(fn, *args):
+    """Calls fn(*args), on the hub's OS thread pool when gevent is active."""
+    if gevent_active():
+        from gevent import get_hub
+        return get_hub().threadpool.apply(fn, args)
+    return fn(*args)
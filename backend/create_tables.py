@@ -1,9 +1,10 @@
 # create_tables.py
+# Kept for existing deploy scripts: brings the schema up to date through the
+# versioned migrations in migrations.py, which it is now equivalent to.
 
-from app import app, db
+from app import create_app
+from migrations import upgrade
 
-# यह सुनिश्चित करने के लिए कि हम सही ऐप कॉन्टेक्स्ट में हैं
-with app.app_context():
-    print("Creating all database tables...")
-    db.create_all()
-    print("All tables created successfully!")
+with create_app().app_context():
+    print("Upgrading database schema...")
+    print(f"Schema is at version {upgrade()}.")
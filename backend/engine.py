@@ -0,0 +1,203 @@
+import re
+import threading
+import time
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.pool import QueuePool
+
+# Engine profiles. `engine_options` builds SQLALCHEMY_ENGINE_OPTIONS for the
+# configured database and `install_profile` attaches the per-connection
+# setup once the engine exists:
+#
+# - sqlite:   WAL journal, busy_timeout and synchronous=NORMAL on every new
+#             connection, plus an in-process writer lock so this process's
+#             write transactions queue up instead of failing with
+#             "database is locked". Readers are never blocked under WAL.
+# - postgres: pool sized from the gunicorn worker/thread count so all
+#             workers together stay within DB_MAX_CONNECTIONS, pre-ping,
+#             recycle, and server-side statement/idle-transaction timeouts.
+# - default:  SQLAlchemy's defaults.
+#
+# Every profile that uses a queue pool records how long checkouts wait, per
+# engine, once `attach_pool_metrics` has run on it.
+
+
+class PoolMetrics:
+    """Counts pool checkouts and how long they waited for a free connection."""
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.bucket_counts = [0] * (len(self.BUCKETS) + 1)
+
+    def observe(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+            else:
+                self.bucket_counts[-1] += 1
+
+    def stats(self, pool=None):
+        with self._lock:
+            data = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': round(self.wait_total, 6),
+                'wait_seconds_max': round(self.wait_max, 6),
+                'wait_seconds_buckets': {
+                    **{str(bound): count for bound, count in zip(self.BUCKETS, self.bucket_counts)},
+                    '+Inf': self.bucket_counts[-1],
+                },
+            }
+        if isinstance(pool, QueuePool):
+            data.update(pool_size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+        return data
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports checkout wait times to its engine's PoolMetrics."""
+
+    metrics = None
+
+    def _do_get(self):
+        if self.metrics is None:
+            return super()._do_get()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.metrics.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool; keep counting into the same metrics.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def attach_pool_metrics(engine):
+    """Gives `engine` its own PoolMetrics as `engine.pool_metrics` and returns it."""
+    engine.pool_metrics = PoolMetrics()
+    if isinstance(engine.pool, TimedQueuePool):
+        engine.pool.metrics = engine.pool_metrics
+    return engine.pool_metrics
+
+
+def profile_for(uri, requested='auto'):
+    if requested != 'auto':
+        return requested
+    if uri.startswith('sqlite'):
+        return 'sqlite'
+    if uri.startswith('postgresql'):
+        return 'postgres'
+    return 'default'
+
+
+def engine_options(uri, profile, workers=1, threads=1, background_threads=0, max_connections=20,
+                   pool_timeout=10, busy_timeout_ms=5000, statement_timeout_ms=15000):
+    if profile == 'sqlite':
+        if uri in ('sqlite://', 'sqlite:///:memory:'):
+            return {}
+        return {
+            'poolclass': TimedQueuePool,
+            'pool_size': threads + background_threads,
+            'max_overflow': 5,
+            'pool_timeout': pool_timeout,
+            # pysqlite sets SQLite's busy handler from this too.
+            'connect_args': {'timeout': busy_timeout_ms / 1000},
+        }
+    if profile == 'postgres':
+        per_worker = max(1, max_connections // max(1, workers))
+        pool_size = max(1, min(threads + background_threads, per_worker))
+        return {
+            'poolclass': TimedQueuePool,
+            'pool_size': pool_size,
+            'max_overflow': per_worker - pool_size,
+            'pool_timeout': pool_timeout,
+            'pool_pre_ping': True,
+            'pool_recycle': 1800,
+            'connect_args': {
+                'options': f'-c statement_timeout={statement_timeout_ms} '
+                           f'-c idle_in_transaction_session_timeout={statement_timeout_ms * 4}'
+            },
+        }
+    return {}
+
+
+WRITE_STATEMENT = re.compile(r'\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER)\b', re.IGNORECASE)
+
+
+def install_profile(engine, profile, busy_timeout_ms=5000):
+    if profile != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute(f'PRAGMA busy_timeout={int(busy_timeout_ms)}')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.close()
+
+    # SQLite allows one writer at a time. Queueing this process's writers on
+    # a lock before their first write statement is fairer than SQLite's
+    # sleep-and-retry busy handler and avoids lock-upgrade failures.
+    writer_lock = threading.Lock()
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def acquire_writer_lock(conn, cursor, statement, parameters, context, executemany):
+        info = conn.connection.info
+        if not info.get('holds_writer_lock') and WRITE_STATEMENT.match(statement):
+            if writer_lock.acquire(timeout=busy_timeout_ms / 1000):
+                info['holds_writer_lock'] = True
+
+    def release_writer_lock(info):
+        if info.pop('holds_writer_lock', False):
+            writer_lock.release()
+
+    # 'commit' fires just before the COMMIT itself; busy_timeout covers that gap.
+    @event.listens_for(engine, 'commit')
+    def release_on_commit(conn):
+        release_writer_lock(conn.connection.info)
+
+    @event.listens_for(engine, 'rollback')
+    def release_on_rollback(conn):
+        release_writer_lock(conn.connection.info)
+
+    @event.listens_for(engine.pool, 'checkin')
+    def release_on_checkin(dbapi_connection, connection_record):
+        if connection_record is not None:
+            release_writer_lock(connection_record.info)
+
+
+def table_size(connection, table_name):
+    """Bytes a table and its indexes occupy, or None where the database can't say."""
+    dialect = connection.dialect.name
+    try:
+        if dialect == 'sqlite':
+            return connection.execute(text(
+                "SELECT SUM(pgsize) FROM dbstat WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = :table)"
+            ), {'table': table_name}).scalar()
+        if dialect == 'postgresql':
+            return connection.execute(text("SELECT pg_total_relation_size(:table)"), {'table': table_name}).scalar()
+    except exc.OperationalError:
+        # SQLite builds without the dbstat virtual table.
+        return None
+    return None
@@ -0,0 +1,189 @@
+# generate_data.py
+# Fills the database with a synthetic corpus for load testing: users,
+# published blogs, comments and submissions, written in batched inserts so
+# millions of rows take minutes, not hours. The same seed and sizes always
+# produce the same data. Three fixed accounts are created first:
+# admin@bench.example.com, guest@bench.example.com and
+# reader@bench.example.com; every account's password is "bench-password".
+#
+#   python generate_data.py [users] [blogs] [comments] [pending] [seed]
+#
+# Writes to DATABASE_URL (default instance/users.db), which must be empty;
+# point it at a throwaway database.
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import create_app, db, User, Blog, Comment, PendingBlog, password_hasher, rebuild_feed
+from migrations import upgrade
+from search import drop_search_index, rebuild_search_index
+
+PASSWORD = 'bench-password'
+ACCOUNTS = {
+    'admin': ('admin@bench.example.com', 'Admin'),
+    'guest': ('guest@bench.example.com', 'Guest Author'),
+    'reader': ('reader@bench.example.com', 'Normal User'),
+}
+CATEGORIES = ['Tech', 'Lifestyle', 'News', 'General', 'Travel', 'Food']
+IMAGE_BASE = 'https://res.cloudinary.example/bench/image/upload'
+BATCH_SIZE = 10_000
+HISTORY_DAYS = 730
+
+WORDS = ("city sustainable green solar energy work week remote assistant morning coffee travel food "
+         "health fitness market startup design music climate ocean river mountain garden code python "
+         "data cloud security people future report story local world team change plan idea").split()
+
+
+def _paragraphs(rng, count=500):
+    # A fixed pool of paragraphs keeps generation cheap; posts join a few of them.
+    filler = [f'word{i}' for i in range(3000)]
+    return [' '.join(rng.choices(WORDS + filler, k=rng.randint(40, 90))).capitalize() + '.'
+            for _ in range(count)]
+
+
+def _insert_batches(model, rows, label):
+    start = time.perf_counter()
+    batch, total = [], 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            db.session.execute(insert(model), batch)
+            db.session.commit()
+            total += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(model), batch)
+        db.session.commit()
+        total += len(batch)
+    elapsed = time.perf_counter() - start
+    print(f"  {label}: {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s)")
+
+
+def _image(n, folder='blog_images'):
+    public_id = f'{folder}/bench-{n % 100}'
+    return {
+        'image_public_id': public_id,
+        'image_url': f'{IMAGE_BASE}/{public_id}.jpg',
+        'image_thumb_url': f'{IMAGE_BASE}/{public_id}-thumb.webp',
+        'image_card_url': f'{IMAGE_BASE}/{public_id}-card.webp',
+        'image_status': 'ready',
+    }
+
+
+def generate(users=1_000, blogs=5_000, comments=20_000, pending=500, seed=42):
+    """Fills empty tables inside the current app context and rebuilds the feed.
+
+    Returns the ids of the three fixed accounts, keyed like ACCOUNTS.
+    """
+    rng = random.Random(seed)
+    paragraphs = _paragraphs(rng)
+    now = datetime.utcnow()
+    oldest = now - timedelta(days=HISTORY_DAYS)
+    hashed = password_hasher.hash(PASSWORD)
+
+    first_user = 1
+    accounts = {key: first_user + n for n, key in enumerate(ACCOUNTS)}
+    user_types = [user_type for _, user_type in ACCOUNTS.values()]
+    user_types += [rng.choices(['Admin', 'Guest Author', 'Normal User'], [1, 20, 979])[0] for _ in range(users)]
+    user_ids = range(first_user, first_user + len(user_types))
+    author_ids = [user_id for user_id, user_type in zip(user_ids, user_types) if user_type != 'Normal User']
+    guest_ids = [user_id for user_id, user_type in zip(user_ids, user_types) if user_type == 'Guest Author']
+    emails = [email for email, _ in ACCOUNTS.values()]
+
+    def user_rows():
+        for n, (user_id, user_type) in enumerate(zip(user_ids, user_types)):
+            row = {
+                'id': user_id,
+                'name': f'Bench {user_type} {n}',
+                'email': emails[n] if n < len(emails) else f'user{user_id}@bench.example.com',
+                'password_hash': hashed,
+                'user_type': user_type,
+            }
+            if user_type != 'Normal User':
+                public_id = f'blog_profiles/bench-{n % 50}'
+                row.update(profile_image_public_id=public_id, profile_image_url=f'{IMAGE_BASE}/{public_id}.jpg',
+                           profile_image_thumb_url=f'{IMAGE_BASE}/{public_id}-thumb.webp',
+                           profile_image_card_url=f'{IMAGE_BASE}/{public_id}-card.webp',
+                           profile_image_status='ready')
+            yield row
+
+    first_blog = 1
+    step = timedelta(days=HISTORY_DAYS) / max(blogs, 1)
+    blog_authors = [rng.choice(author_ids) for _ in range(blogs)]
+
+    def blog_date(index):
+        return oldest + step * index
+
+    def text():
+        return '\n\n'.join(rng.choices(paragraphs, k=rng.randint(2, 8)))
+
+    def title():
+        return ' '.join(rng.choices(WORDS, k=rng.randint(3, 8))).title()
+
+    def blog_rows():
+        for index in range(blogs):
+            pub_date = blog_date(index)
+            yield {
+                'id': first_blog + index, 'title': title(), 'content': text(), **_image(index),
+                'category': rng.choice(CATEGORIES), 'pub_date': pub_date, 'updated_at': pub_date,
+                'user_id': blog_authors[index],
+            }
+
+    def comment_rows():
+        for _ in range(comments if blogs else 0):
+            # Recent posts get most of the comments.
+            index = blogs - 1 - int(blogs * rng.random() ** 3)
+            yield {
+                'content': ' '.join(rng.choices(WORDS, k=rng.randint(5, 40))).capitalize() + '.',
+                'pub_date': min(now, blog_date(index) + timedelta(seconds=rng.randint(0, 30 * 86400))),
+                'user_id': rng.choice(user_ids),
+                'blog_id': first_blog + index,
+            }
+
+    def pending_rows():
+        for n in range(pending):
+            submitted = oldest + timedelta(seconds=rng.randint(0, HISTORY_DAYS * 86400))
+            if blogs and rng.random() < 0.2:
+                # Approved submissions keep only a link to the blog they became.
+                index = rng.randrange(blogs)
+                yield {
+                    'title': title(), 'content': '', 'image_public_id': '', 'image_url': '',
+                    'image_status': 'ready', 'category': rng.choice(CATEGORIES), 'status': 'approved',
+                    'user_id': blog_authors[index], 'submitted_date': submitted, 'blog_id': first_blog + index,
+                }
+            else:
+                yield {
+                    'title': title(), 'content': text(), **_image(n),
+                    'category': rng.choice(CATEGORIES), 'status': 'pending',
+                    'user_id': rng.choice(guest_ids), 'submitted_date': submitted,
+                }
+
+    print(f"Generating corpus (seed {seed}):")
+    _insert_batches(User, user_rows(), 'users')
+    with db.engine.begin() as connection:
+        drop_search_index(connection)
+    _insert_batches(Blog, blog_rows(), 'blogs')
+    start = time.perf_counter()
+    with db.engine.begin() as connection:
+        rebuild_search_index(connection)
+    print(f"  search index rebuilt in {time.perf_counter() - start:.1f}s")
+    _insert_batches(Comment, comment_rows(), 'comments')
+    _insert_batches(PendingBlog, pending_rows(), 'submissions')
+    start = time.perf_counter()
+    rebuild_feed()
+    db.session.commit()
+    print(f"  feed rebuilt in {time.perf_counter() - start:.1f}s")
+    return accounts
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:6]]
+    with create_app().app_context():
+        upgrade()
+        if User.query.first():
+            sys.exit("The database already has users; point DATABASE_URL at an empty one.")
+        generate(*sizes)
@@ -0,0 +1,60 @@
+# gunicorn.conf.py
+# Serving configuration; gunicorn loads it automatically when started from
+# this directory (`gunicorn wsgi:app`). Pick the worker class with
+# WEB_WORKER_CLASS:
+#
+#   sync     one request at a time per process. Any wait (database, Cloudinary,
+#            a slow client) idles the whole process.
+#            workers = 2 * cores + 1      concurrency = workers
+#   gthread  (default) WEB_THREADS request threads per process; waits release
+#            the GIL, so threads overlap I/O.
+#            workers = cores + 1          concurrency = workers * WEB_THREADS
+#   gevent   one event loop per process multiplexing WEB_WORKER_CONNECTIONS
+#            connections; the standard library is patched so socket I/O,
+#            sleeps and locks yield to other requests. Password hashing and
+#            image resizing run on real OS threads (cooperative.py).
+#            workers = cores              concurrency = workers * WEB_WORKER_CONNECTIONS
+#
+# Set WEB_CONCURRENCY to override the worker count. Every class needs enough
+# memory for `workers` copies of the app.
+#
+# Database connections: each worker's pool holds as many connections as it
+# runs queries at once (1 for sync, WEB_THREADS for gthread, DB_POOL_SIZE for
+# gevent) plus MEDIA_WORKER_THREADS, and on Postgres the workers together stay
+# within DB_MAX_CONNECTIONS (see engine.py). Under gevent, requests beyond
+# DB_POOL_SIZE wait up to DB_POOL_TIMEOUT seconds for a connection; the
+# pool-stats endpoint and /metrics show how long.
+#
+# gevent needs a database driver that yields while waiting: psycopg2 is made
+# cooperative below when psycogreen is installed. SQLite calls block the event
+# loop while they run (usually well under a millisecond, but a write waiting
+# on another process's lock blocks it for up to DB_BUSY_TIMEOUT_MS), so use
+# gevent with Postgres in production.
+
+import multiprocessing
+import os
+
+worker_class = os.environ.get('WEB_WORKER_CLASS', 'gthread')
+cores = multiprocessing.cpu_count()
+workers = int(os.environ.get('WEB_CONCURRENCY') or {
+    'sync': 2 * cores + 1,
+    'gevent': cores,
+}.get(worker_class, cores + 1))
+threads = int(os.environ.get('WEB_THREADS', 4)) if worker_class == 'gthread' else 1
+worker_connections = int(os.environ.get('WEB_WORKER_CONNECTIONS', 500))
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', 10000)}")
+timeout = int(os.environ.get('WEB_TIMEOUT', 30))
+keepalive = 5
+
+# Workers load wsgi.py after this runs; share the shape so create_app sizes its pools to match.
+os.environ['WEB_WORKER_CLASS'] = worker_class
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            return
+        patch_psycopg()
@@ -1,36 +1,43 @@
-from app import app, db, User, Blog
-from werkzeug.security import generate_password_hash
-import os
+# init_db.py
+# Brings the schema up to date and adds the demo accounts and blogs that are
+# missing. Existing data is kept unless --reset is given, which drops every
+# table first.
+#
+#   python init_db.py [--reset]
 
-def initialize_database():
-    with app.app_context():
+import sys
+
+from app import create_app, db, User, Blog, password_hasher, rebuild_feed
+from migrations import schema_version, upgrade
+
+def initialize_database(reset=False):
+    with create_app().app_context():
         print("Starting database initialization...")
-        
-        instance_path = os.path.join(os.path.dirname(__file__), 'instance')
-        if not os.path.exists(instance_path):
-            os.makedirs(instance_path)
-            print("Instance folder created.")
 
-        db.drop_all()
-        db.create_all()
-        print("Database tables created.")
+        if reset:
+            db.drop_all()
+            schema_version.drop(db.engine, checkfirst=True)
+            print("Existing tables dropped.")
+
+        upgrade()
+        print("Database schema is up to date.")
 
         if not User.query.filter_by(user_type='Admin').first():
-            admin_user = User(name='Admin', email='admin@example.com', password_hash=generate_password_hash('admin123'), user_type='Admin')
+            admin_user = User(name='Admin', email='admin@example.com', password_hash=password_hasher.hash('admin123'), user_type='Admin')
             db.session.add(admin_user)
             print("Admin user created (email: admin@example.com, pass: admin123).")
         else:
             print("Admin user already exists.")
         
         if not User.query.filter_by(email='guest@example.com').first():
-            guest_user = User(name='Guest Author One', email='guest@example.com', password_hash=generate_password_hash('guest123'), user_type='Guest Author')
+            guest_user = User(name='Guest Author One', email='guest@example.com', password_hash=password_hasher.hash('guest123'), user_type='Guest Author')
             db.session.add(guest_user)
             print("Guest Author user created (email: guest@example.com, pass: guest123).")
         else:
             print("Guest Author already exists.")
 
         if not User.query.filter_by(email='user@example.com').first():
-            normal_user = User(name='Normal User One', email='user@example.com', password_hash=generate_password_hash('user123'), user_type='Normal User')
+            normal_user = User(name='Normal User One', email='user@example.com', password_hash=password_hasher.hash('user123'), user_type='Normal User')
             db.session.add(normal_user)
             print("Normal user created (email: user@example.com, pass: user123).")
         else:
@@ -127,10 +134,12 @@ It’s a simple change that can have a big impact on your life.""",
             )
 
             db.session.add_all([blog1, blog2, blog3, blog4])
+            db.session.flush()
+            rebuild_feed()
             db.session.commit()
             print("4 new dummy blogs have been added to the database.")
         else:
             print("Blogs already exist.")
 
 if __name__ == '__main__':
-    initialize_database()
+    initialize_database(reset='--reset' in sys.argv[1:])
@@ -0,0 +1,175 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Media uploads and deletes run as durable jobs (the MediaJob table in app.py)
+# processed by MediaWorker threads, so request handlers never wait on the
+# media host. Files are staged on local disk until their upload job finishes.
+
+# Responsive variants generated from every upload: name -> max width in px.
+# 'full' is stored under the job's public_id; the others get a suffix.
+IMAGE_VARIANTS = {'thumb': 320, 'card': 800, 'full': 1600}
+IMAGE_FORMAT = 'WEBP'
+IMAGE_QUALITY = 80
+
+
+def variant_public_id(public_id, variant):
+    return public_id if variant == 'full' else f'{public_id}_{variant}'
+
+
+def base_public_id(asset_id):
+    """Inverse of variant_public_id: the image public_id an asset belongs to."""
+    for variant in IMAGE_VARIANTS:
+        if variant != 'full' and asset_id.endswith(f'_{variant}'):
+            return asset_id[:-len(variant) - 1]
+    return asset_id
+
+
+def all_variant_public_ids(public_id):
+    """Every hosted asset that may belong to an image (older uploads only have the first)."""
+    return [variant_public_id(public_id, variant) for variant in IMAGE_VARIANTS]
+
+
+def variant_paths_for(path):
+    return [f'{path}.{variant}.webp' for variant in IMAGE_VARIANTS]
+
+
+def process_image(path, variants=IMAGE_VARIANTS):
+    """Writes a downsized, metadata-free copy of the image for each variant.
+
+    Returns {variant: path}. Files Pillow can't decode are passed through
+    untouched as the only ('full') variant. Pillow is imported here, on the
+    first upload, rather than when the app starts.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+    try:
+        with Image.open(path) as original:
+            image = ImageOps.exif_transpose(original)
+            image.load()
+    except (UnidentifiedImageError, OSError):
+        return {'full': path}
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+    outputs = {}
+    for variant, max_width in variants.items():
+        resized = image
+        if image.width > max_width:
+            resized = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+        variant_path = f'{path}.{variant}.webp'
+        # Re-encoding without passing exif/icc info drops all metadata.
+        resized.save(variant_path, IMAGE_FORMAT, quality=IMAGE_QUALITY, method=4)
+        outputs[variant] = variant_path
+    return outputs
+
+
+def backoff_delay(attempts, base_seconds, max_seconds):
+    return min(base_seconds * (2 ** (attempts - 1)), max_seconds)
+
+
+class MediaWorker:
+    """Polls the job table and runs due jobs on a small pool of daemon threads.
+
+    Jobs are claimed with a conditional UPDATE, so any number of worker
+    threads and processes (e.g. every gunicorn worker) can share one table.
+    A job left 'running' longer than `stale_after` seconds (its worker
+    died) is claimed again.
+    """
+
+    def __init__(self, app, db, job_model, handle_job, handle_failure, threads=1,
+                 poll_interval=2.0, max_attempts=5, backoff_base=2.0, backoff_max=300.0, stale_after=300.0):
+        self.app = app
+        self.db = db
+        self.job_model = job_model
+        self.handle_job = handle_job
+        self.handle_failure = handle_failure
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stale_after = stale_after
+        self._wake = threading.Event()
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        for i in range(self.threads):
+            threading.Thread(target=self._loop, name=f'media-worker-{i}', daemon=True).start()
+
+    def wake(self):
+        self._wake.set()
+
+    def _loop(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    processed = self.run_once()
+            except Exception as e:
+                self.app.logger.exception(f"Media worker loop error: {e}")
+                processed = 0
+            if not processed:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _claim(self, job_id):
+        Job = self.job_model
+        now = datetime.utcnow()
+        claimable = self.db.or_(
+            Job.status == 'pending',
+            self.db.and_(Job.status == 'running', Job.updated_at < now - timedelta(seconds=self.stale_after))
+        )
+        claimed = Job.query.filter(Job.id == job_id, claimable).update(
+            {Job.status: 'running', Job.attempts: Job.attempts + 1, Job.updated_at: now},
+            synchronize_session=False
+        )
+        self.db.session.commit()
+        return claimed == 1
+
+    def run_once(self, batch_size=10):
+        """Runs up to `batch_size` due jobs in the calling thread; returns how many ran."""
+        Job = self.job_model
+        now = datetime.utcnow()
+        due_ids = [job_id for (job_id,) in self.db.session.query(Job.id).filter(
+            self.db.or_(
+                self.db.and_(Job.status == 'pending', Job.next_attempt_at <= now),
+                self.db.and_(Job.status == 'running', Job.updated_at < now - timedelta(seconds=self.stale_after))
+            )
+        ).order_by(Job.id).limit(batch_size)]
+
+        processed = 0
+        for job_id in due_ids:
+            if not self._claim(job_id):
+                continue
+            job = self.db.session.get(Job, job_id)
+            try:
+                self.handle_job(job)
+                job.status = 'done'
+                job.last_error = None
+            except Exception as e:
+                self.db.session.rollback()
+                job = self.db.session.get(Job, job_id)
+                job.last_error = str(e)[:500]
+                if job.attempts >= self.max_attempts:
+                    job.status = 'failed'
+                    self.handle_failure(job)
+                else:
+                    job.status = 'pending'
+                    job.next_attempt_at = datetime.utcnow() + timedelta(
+                        seconds=backoff_delay(job.attempts, self.backoff_base, self.backoff_max))
+                self.app.logger.warning(f"Media job {job.id} ({job.kind}) attempt {job.attempts} failed: {e}")
+            job.updated_at = datetime.utcnow()
+            self.db.session.commit()
+            processed += 1
+        return processed
+
+    def drain(self, timeout=10.0):
+        """Runs jobs in the calling thread until none are due (used by scripts and tests)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.run_once():
+            pass
@@ -0,0 +1,17 @@
+# media_worker.py
+# Runs the media job worker as its own process. Use this when the web
+# workers are started with MEDIA_WORKER_THREADS=0. The staging directory
+# (MEDIA_STAGING_DIR) must be shared with the web containers.
+
+import time
+from app import create_app
+
+if __name__ == '__main__':
+    app = create_app()
+    media_worker = app.extensions['services']['media_worker']
+    print("Media worker started. Press Ctrl+C to stop.")
+    while True:
+        with app.app_context():
+            processed = media_worker.run_once()
+        if not processed:
+            time.sleep(media_worker.poll_interval)
@@ -0,0 +1,133 @@
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+# In-process metrics rendered in the Prometheus text format at /metrics.
+# Each gunicorn worker keeps its own numbers; Prometheus scrapes them per
+# worker (or a sidecar aggregates them), like any multi-process exporter.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+QUERY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def render_histogram(name, help_text, series, buckets, labelnames=()):
+    """Prometheus lines for {label values: (per-bucket counts incl. +Inf, sum)}."""
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for values, (counts, total) in sorted(series.items()):
+        cumulative = 0
+        for bound, count in zip(list(buckets) + ['+Inf'], counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{_label_text(labelnames, values, [("le", bound)])} {cumulative}')
+        lines.append(f'{name}_sum{_label_text(labelnames, values)} {total}')
+        lines.append(f'{name}_count{_label_text(labelnames, values)} {cumulative}')
+    return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._series[key] = (counts, total + value)
+
+    def render(self):
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+        return render_histogram(self.name, self.help_text, series, self.buckets, self.labelnames)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._histograms = []
+        self._collectors = []
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        histogram = Histogram(name, help_text, labelnames, buckets)
+        self._histograms.append(histogram)
+        return histogram
+
+    def add_collector(self, collect):
+        """Registers a callable returning extra exposition lines, evaluated at scrape time."""
+        self._collectors.append(collect)
+
+    def render(self):
+        lines = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        for collect in self._collectors:
+            lines.extend(collect())
+        return '\n'.join(lines) + '\n'
+
+
+class RequestMetrics:
+    """Records latency, response size and SQL work of every request."""
+
+    def __init__(self, app, registry):
+        self.request_seconds = registry.histogram(
+            'http_request_duration_seconds', 'Request latency by route.', ('method', 'route', 'status'))
+        self.response_bytes = registry.histogram(
+            'http_response_size_bytes', 'Response body size by route.', ('method', 'route'), SIZE_BUCKETS)
+        self.request_queries = registry.histogram(
+            'http_request_sql_queries', 'SQL statements run per request.', ('method', 'route'), COUNT_BUCKETS)
+        self.request_sql_seconds = registry.histogram(
+            'http_request_sql_duration_seconds', 'Time spent in SQL per request.', ('method', 'route'))
+        self.query_seconds = registry.histogram(
+            'sql_query_duration_seconds', 'SQL statement latency by engine.', ('engine',), QUERY_BUCKETS)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def watch_engine(self, engine, name):
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info['metrics_query_start'].pop()
+            self.query_seconds.observe(elapsed, engine=name)
+            if has_request_context() and 'metrics_started_at' in g:
+                g.metrics_queries += 1
+                g.metrics_sql_seconds += elapsed
+
+    def _start(self):
+        g.metrics_started_at = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_sql_seconds = 0.0
+
+    def _finish(self, response):
+        if 'metrics_started_at' not in g:
+            return response
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        method = request.method
+        self.request_seconds.observe(time.perf_counter() - g.metrics_started_at,
+                                     method=method, route=route, status=response.status_code)
+        # Streamed files (send_from_directory) report their length up front; generators don't.
+        if response.content_length is not None:
+            self.response_bytes.observe(response.content_length, method=method, route=route)
+        self.request_queries.observe(g.metrics_queries, method=method, route=route)
+        self.request_sql_seconds.observe(g.metrics_sql_seconds, method=method, route=route)
+        return response
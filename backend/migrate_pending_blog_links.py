@@ -0,0 +1,34 @@
+# migrate_pending_blog_links.py
+# Upgrades the schema through migration 11 (migrations.py), which adds
+# pending_blog.blog_id, links every approved submission to the blog it was
+# published as and drops the submission's duplicate copy of the content and
+# image fields, then reclaims the space. Prints the table's size before and
+# after. Safe to re-run.
+
+from sqlalchemy import text
+
+from app import create_app, db
+from engine import table_size
+from migrations import upgrade
+
+
+def compact():
+    if db.engine.dialect.name == 'sqlite':
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.execute(text("VACUUM"))
+
+
+def describe(size):
+    return 'unknown' if size is None else f'{size / 1024:.1f} KiB'
+
+
+if __name__ == '__main__':
+    with create_app().app_context():
+        with db.engine.connect() as connection:
+            before = table_size(connection, 'pending_blog')
+        upgrade()
+        db.session.remove()
+        compact()
+        with db.engine.connect() as connection:
+            after = table_size(connection, 'pending_blog')
+        print(f"pending_blog size: {describe(before)} -> {describe(after)}")
@@ -0,0 +1,297 @@
+# migrations.py
+# Versioned schema migrations. The app never creates or checks tables when it
+# starts; run this as its own deploy step, before new web workers come up:
+#
+#   python migrations.py            upgrade to the latest version
+#   python migrations.py status     print the current and latest versions
+#
+# schema_version records the last migration applied, and each one runs once,
+# in order, committed together with its version. Migration 1 is the schema
+# of the original app; every later one is the change one feature made, as
+# explicit DDL that never follows the models. Each step skips what already
+# exists, so a database made by create_all() at any earlier point is adopted
+# as it is. Append new migrations to MIGRATIONS; never change one that has
+# shipped.
+
+import sys
+
+from sqlalchemy import (Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text, bindparam, column,
+                        func, inspect, select, table, text, update)
+
+from app import create_app, db
+from search import rebuild_search_index
+
+schema_version = Table('schema_version', MetaData(), Column('version', Integer, nullable=False))
+
+# Tables as the migration that introduced them created them.
+frozen = MetaData()
+
+Table('user', frozen,
+      Column('id', Integer, primary_key=True),
+      Column('name', String(100), nullable=False),
+      Column('email', String(100), unique=True, nullable=False),
+      Column('password_hash', String(256), nullable=False),
+      Column('user_type', String(50), nullable=False),
+      Column('profile_image_url', String(300)),
+      Column('profile_image_public_id', String(200)))
+
+Table('blog', frozen,
+      Column('id', Integer, primary_key=True),
+      Column('title', String(200), nullable=False),
+      Column('content', Text, nullable=False),
+      Column('image_url', String(300), nullable=False),
+      Column('image_public_id', String(200), nullable=False),
+      Column('category', String(50), nullable=False),
+      Column('pub_date', DateTime, nullable=False),
+      Column('user_id', Integer, ForeignKey('user.id'), nullable=False))
+
+Table('comment', frozen,
+      Column('id', Integer, primary_key=True),
+      Column('content', Text, nullable=False),
+      Column('pub_date', DateTime, nullable=False),
+      Column('user_id', Integer, ForeignKey('user.id'), nullable=False),
+      Column('blog_id', Integer, ForeignKey('blog.id'), nullable=False))
+
+Table('pending_blog', frozen,
+      Column('id', Integer, primary_key=True),
+      Column('title', String(200), nullable=False),
+      Column('content', Text, nullable=False),
+      Column('image_public_id', String(200), nullable=False),
+      Column('image_url', String(300), nullable=False),
+      Column('category', String(50), nullable=False),
+      Column('status', String(50), nullable=False),
+      Column('rejection_reason', Text),
+      Column('user_id', Integer, ForeignKey('user.id'), nullable=False),
+      Column('submitted_date', DateTime, nullable=False))
+
+Table('media_job', frozen,
+      Column('id', Integer, primary_key=True),
+      Column('kind', String(20), nullable=False),
+      Column('target_type', String(20)),
+      Column('target_id', Integer),
+      Column('folder', String(100)),
+      Column('staged_path', String(500)),
+      Column('public_id', String(200)),
+      Column('replaces_public_id', String(200)),
+      Column('status', String(20), nullable=False),
+      Column('attempts', Integer, nullable=False),
+      Column('last_error', Text),
+      Column('next_attempt_at', DateTime, nullable=False),
+      Column('created_at', DateTime, nullable=False),
+      Column('updated_at', DateTime, nullable=False))
+
+Table('revoked_token', frozen,
+      Column('jti', String(36), primary_key=True),
+      Column('expires_at', DateTime, nullable=False))
+
+Table('feed_entry', frozen,
+      Column('blog_id', Integer, ForeignKey('blog.id'), primary_key=True),
+      Column('title', String(200), nullable=False),
+      Column('snippet', String(200), nullable=False),
+      Column('image_url', String(300), nullable=False),
+      Column('category', String(50), nullable=False),
+      Column('pub_date', DateTime, nullable=False),
+      Column('author_id', Integer, ForeignKey('user.id'), nullable=False),
+      Column('author_name', String(100), nullable=False),
+      Column('author_image_url', String(300)),
+      Column('comment_count', Integer, nullable=False),
+      Column('updated_at', DateTime, nullable=False))
+
+Table('listing_version', frozen,
+      Column('listing', String(50), primary_key=True),
+      Column('version', Integer, nullable=False))
+
+
+def _quote(connection, name):
+    return connection.dialect.identifier_preparer.quote(name)
+
+
+def _create_table(connection, name):
+    frozen.tables[name].create(connection, checkfirst=True)
+
+
+def _add_column(connection, table, definition):
+    """ALTER TABLE ... ADD COLUMN `definition` unless the column exists; True if it was added."""
+    name = definition.split()[0]
+    if name in {column['name'] for column in inspect(connection).get_columns(table)}:
+        return False
+    connection.execute(text(f"ALTER TABLE {_quote(connection, table)} ADD COLUMN {definition}"))
+    return True
+
+
+def _create_index(connection, name, table, *columns):
+    connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {_quote(connection, table)} ({', '.join(columns)})"))
+
+
+def _baseline(connection):
+    tables = [frozen.tables[name] for name in ('user', 'blog', 'comment', 'pending_blog')]
+    for baseline_table in tables:
+        baseline_table.create(connection, checkfirst=True)
+    inspector = inspect(connection)
+    missing = [f'{baseline_table.name}.{name}' for baseline_table in tables
+               for name in baseline_table.columns.keys()
+               if name not in {existing['name'] for existing in inspector.get_columns(baseline_table.name)}]
+    if missing:
+        raise RuntimeError(f"Tables predate the original schema and lack {', '.join(missing)}; "
+                           "they can't be upgraded in place.")
+
+
+def _blog_listing_indexes(connection):
+    _create_index(connection, 'ix_blog_pub_date_id', 'blog', 'pub_date', 'id')
+    _create_index(connection, 'ix_blog_category_pub_date_id', 'blog', 'category', 'pub_date', 'id')
+
+
+def _blog_search_index(connection):
+    rebuild_search_index(connection)
+
+
+def _blog_updated_at(connection):
+    # NOT NULL needs a default for existing rows; they start at their publication time.
+    if _add_column(connection, 'blog', "updated_at TIMESTAMP NOT NULL DEFAULT '1970-01-01 00:00:00'"):
+        connection.execute(text("UPDATE blog SET updated_at = pub_date"))
+    _create_index(connection, 'ix_blog_updated_at', 'blog', 'updated_at')
+
+
+def _comment_page_index(connection):
+    _create_index(connection, 'ix_comment_blog_id_pub_date_id', 'comment', 'blog_id', 'pub_date', 'id')
+
+
+def _media_jobs(connection):
+    _create_table(connection, 'media_job')
+    _create_index(connection, 'ix_media_job_status_next_attempt_at', 'media_job', 'status', 'next_attempt_at')
+    _add_column(connection, 'user', "profile_image_status VARCHAR(20)")
+    _add_column(connection, 'blog', "image_status VARCHAR(20) NOT NULL DEFAULT 'ready'")
+    _add_column(connection, 'pending_blog', "image_status VARCHAR(20) NOT NULL DEFAULT 'ready'")
+
+
+def _image_variant_urls(connection):
+    _add_column(connection, 'user', "profile_image_thumb_url VARCHAR(300)")
+    _add_column(connection, 'user', "profile_image_card_url VARCHAR(300)")
+    for name in ('blog', 'pending_blog'):
+        _add_column(connection, name, "image_thumb_url VARCHAR(300)")
+        _add_column(connection, name, "image_card_url VARCHAR(300)")
+
+
+def _revoked_tokens(connection):
+    _create_table(connection, 'revoked_token')
+    _create_index(connection, 'ix_revoked_token_expires_at', 'revoked_token', 'expires_at')
+
+
+def _home_feed(connection):
+    _create_table(connection, 'feed_entry')
+    _create_index(connection, 'ix_feed_entry_pub_date_blog_id', 'feed_entry', 'pub_date', 'blog_id')
+    _create_index(connection, 'ix_feed_entry_category_pub_date_blog_id', 'feed_entry', 'category', 'pub_date', 'blog_id')
+    _create_index(connection, 'ix_feed_entry_updated_at', 'feed_entry', 'updated_at')
+    _create_index(connection, 'ix_feed_entry_author_id', 'feed_entry', 'author_id')
+    # One row per blog that doesn't have one yet, as rebuild_feed() builds them.
+    connection.execute(text(f"""
+        INSERT INTO feed_entry (blog_id, title, snippet, image_url, category, pub_date, author_id, author_name,
+                                author_image_url, comment_count, updated_at)
+        SELECT blog.id, blog.title, substr(blog.content, 1, 100), coalesce(blog.image_thumb_url, blog.image_url),
+               blog.category, blog.pub_date, author.id, author.name,
+               coalesce(author.profile_image_thumb_url, author.profile_image_url),
+               (SELECT count(*) FROM comment WHERE comment.blog_id = blog.id), blog.updated_at
+        FROM blog JOIN {_quote(connection, 'user')} AS author ON author.id = blog.user_id
+        WHERE NOT EXISTS (SELECT 1 FROM feed_entry WHERE feed_entry.blog_id = blog.id)
+    """))
+
+
+def _moderation_queue(connection):
+    _create_index(connection, 'ix_pending_blog_status_submitted_date', 'pending_blog', 'status', 'submitted_date')
+    _add_column(connection, 'media_job', "public_ids TEXT")
+
+
+def _link_approved_submissions(connection):
+    _add_column(connection, 'pending_blog', "blog_id INTEGER REFERENCES blog (id)")
+    _create_index(connection, 'ix_pending_blog_blog_id', 'pending_blog', 'blog_id')
+    _create_index(connection, 'ix_pending_blog_user_id_submitted_date', 'pending_blog', 'user_id', 'submitted_date')
+
+    # Pair each unlinked approved submission with the blog published from it.
+    pending = table('pending_blog', column('id'), column('user_id'), column('title'), column('image_public_id'),
+                    column('status'), column('blog_id'), column('content'), column('image_url'),
+                    column('image_thumb_url'), column('image_card_url'))
+    blog = table('blog', column('id'), column('user_id'), column('title'), column('image_public_id'))
+    unlinked = connection.execute(
+        select(pending.c.id, pending.c.user_id, pending.c.title, pending.c.image_public_id)
+        .where(pending.c.status == 'approved', pending.c.blog_id.is_(None)).order_by(pending.c.id)
+    ).all()
+    taken = {blog_id for (blog_id,) in connection.execute(select(pending.c.blog_id).where(pending.c.blog_id.isnot(None)))}
+    candidates = connection.execute(
+        select(blog.c.id, blog.c.user_id, blog.c.title, blog.c.image_public_id)
+        .where(blog.c.user_id.in_({submission.user_id for submission in unlinked})).order_by(blog.c.id)
+    ).all() if unlinked else []
+    links = {}
+    # Strictest match first; the later passes catch blogs edited after publishing.
+    for key in (lambda row: (row.user_id, row.image_public_id, row.title),
+                lambda row: (row.user_id, row.image_public_id),
+                lambda row: (row.user_id, row.title)):
+        for submission in unlinked:
+            if submission.id in links:
+                continue
+            match = next((row for row in candidates if row.id not in taken and key(row) == key(submission)), None)
+            if match:
+                links[submission.id] = match.id
+                taken.add(match.id)
+    if links:
+        connection.execute(update(pending).where(pending.c.id == bindparam('submission_id'))
+                           .values(blog_id=bindparam('linked_blog_id')),
+                           [{'submission_id': submission_id, 'linked_blog_id': blog_id}
+                            for submission_id, blog_id in links.items()])
+
+    # The published blog holds the content and images now.
+    connection.execute(update(pending).where(pending.c.status == 'approved', pending.c.content != '').values(
+        content='', image_url='', image_public_id='', image_thumb_url=None, image_card_url=None))
+
+
+def _listing_versions(connection):
+    # Listings without a row are at version 0 until their first change.
+    _create_table(connection, 'listing_version')
+
+
+MIGRATIONS = [
+    (1, 'baseline schema', _baseline),
+    (2, 'blog listing indexes', _blog_listing_indexes),
+    (3, 'full-text search index', _blog_search_index),
+    (4, 'blog.updated_at for conditional GETs', _blog_updated_at),
+    (5, 'comment page index', _comment_page_index),
+    (6, 'media jobs and image status', _media_jobs),
+    (7, 'responsive image variant URLs', _image_variant_urls),
+    (8, 'revoked token denylist', _revoked_tokens),
+    (9, 'home feed table', _home_feed),
+    (10, 'moderation queue index and batched deletes', _moderation_queue),
+    (11, 'link approved submissions to their blogs', _link_approved_submissions),
+    (12, 'home page listing versions', _listing_versions),
+]
+LATEST = MIGRATIONS[-1][0]
+
+
+def current_version(connection):
+    if not inspect(connection).has_table(schema_version.name):
+        return 0
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def upgrade(target=LATEST, log=print):
+    """Applies every migration after the database's version, up to `target`; needs an app context."""
+    connection = db.session.connection()
+    schema_version.create(connection, checkfirst=True)
+    version = current_version(connection)
+    for number, description, migrate in MIGRATIONS:
+        if version < number <= target:
+            log(f"Applying migration {number}: {description}...")
+            connection = db.session.connection()
+            migrate(connection)
+            connection.execute(schema_version.delete())
+            connection.execute(schema_version.insert().values(version=number))
+            db.session.commit()
+            version = number
+    db.session.commit()
+    return version
+
+
+if __name__ == '__main__':
+    with create_app().app_context():
+        if sys.argv[1:] == ['status']:
+            print(f"Schema version {current_version(db.session.connection())} (latest {LATEST}).")
+        else:
+            print(f"Schema is at version {upgrade()}.")
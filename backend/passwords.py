@@ -0,0 +1,61 @@
+import threading
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from cooperative import native_executor
+
+# Password hashing for signup and login. The KDF is deliberately slow, so it
+# runs on a small dedicated thread pool: at most `workers` hashes are computed
+# at once and at most `max_pending` more may wait, which keeps a burst of
+# login attempts from tying up every request thread. hashlib's scrypt and
+# pbkdf2 release the GIL while they run, so other requests keep being served.
+# Under gevent the pool is made of real OS threads (see cooperative.py).
+
+
+class HasherBusy(Exception):
+    """Raised when the KDF pool's queue is full; the caller should answer 503."""
+
+
+class PasswordHasher:
+    def __init__(self, method='scrypt:32768:8:1', workers=2, max_pending=16):
+        self.method = method
+        self._executor = native_executor(workers, thread_name_prefix='kdf')
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._reference_hash = None
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        """Returns (matches, needs_rehash).
+
+        Pass stored_hash=None for an unknown account: a dummy hash is checked
+        so the response takes as long as for a real one.
+        """
+        if stored_hash is None:
+            self._run(check_password_hash, self._reference(), password)
+            return False, False
+        if not self._run(check_password_hash, stored_hash, password):
+            return False, False
+        return True, self.needs_rehash(stored_hash)
+
+    def needs_rehash(self, stored_hash):
+        # Comparing against a real hash expands shorthand such as 'scrypt'
+        # into the full parameter string Werkzeug stores.
+        return stored_hash.split('$', 1)[0] != self._reference().split('$', 1)[0]
+
+    def _reference(self):
+        if self._reference_hash is None:
+            self._reference_hash = self.hash('')
+        return self._reference_hash
@@ -0,0 +1,93 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from flask import g, request
+
+# Opt-in sampling profiler for slow requests. While enabled, one daemon
+# thread samples the stack of every in-flight request thread each
+# `interval` seconds. When a request turns out slower than `threshold`,
+# its samples are written as folded stacks ("frame;frame;frame count"),
+# the input format of flamegraph.pl, speedscope and inferno. Fast
+# requests' samples are simply dropped.
+#
+# Each request's samples live in its own buffer (on flask.g), so requests
+# that share an OS thread, as greenlets do under gevent workers, never mix.
+# A greenlet that is switched out is sampled through its saved frame.
+
+
+def _fold(frame):
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(frames))
+
+
+def _current_greenlet():
+    greenlet = sys.modules.get('greenlet')
+    return greenlet.getcurrent() if greenlet is not None else None
+
+
+class SlowRequestProfiler:
+    def __init__(self, app, threshold, interval=0.005, output_dir='profiles'):
+        self.app = app
+        self.threshold = threshold
+        self.interval = interval
+        self.output_dir = output_dir
+        self._samples = {}  # id(buffer) -> (thread id, greenlet or None, Counter of folded stacks)
+        self._lock = threading.Lock()
+        self._sampler = None
+        app.before_request(self._start)
+        app.teardown_request(self._finish)
+
+    def _ensure_sampler(self):
+        if self._sampler is None:
+            with self._lock:
+                if self._sampler is None:
+                    self._sampler = threading.Thread(target=self._sample_loop, name='slow-request-profiler', daemon=True)
+                    self._sampler.start()
+
+    def _sample_loop(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                watched = list(self._samples.values())
+            if not watched:
+                continue
+            frames = sys._current_frames()
+            for thread_id, greenlet, stacks in watched:
+                # A running greenlet has no saved frame; its thread's current frame is its own.
+                frame = getattr(greenlet, 'gr_frame', None) or frames.get(thread_id)
+                if frame is not None:
+                    stacks[_fold(frame)] += 1
+
+    def _start(self):
+        self._ensure_sampler()
+        g.profiler_started_at = time.perf_counter()
+        g.profiler_samples = Counter()
+        with self._lock:
+            self._samples[id(g.profiler_samples)] = (threading.get_ident(), _current_greenlet(), g.profiler_samples)
+
+    def _finish(self, exc):
+        stacks = g.pop('profiler_samples', None)
+        if stacks is None:
+            return
+        with self._lock:
+            self._samples.pop(id(stacks), None)
+        elapsed = time.perf_counter() - g.profiler_started_at
+        if elapsed < self.threshold or not stacks:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        route = (request.url_rule.rule if request.url_rule else 'unmatched').strip('/').replace('/', '_') or 'root'
+        route = ''.join(c if c.isalnum() or c in '_-' else '' for c in route)
+        path = os.path.join(self.output_dir, f'{time.strftime("%Y%m%d-%H%M%S")}-{int(elapsed * 1000)}ms-{request.method}-{route}-{uuid.uuid4().hex[:8]}.folded')
+        with open(path, 'w') as output:
+            for stack, count in stacks.most_common():
+                output.write(f'{stack} {count}\n')
+        self.app.logger.warning(f"Slow request {request.method} {request.path} took {elapsed * 1000:.0f} ms; "
+                                f"{sum(stacks.values())} stack samples written to {path}")
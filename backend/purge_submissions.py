@@ -0,0 +1,28 @@
+# purge_submissions.py
+# Retention job: deletes approved submissions older than
+# SUBMISSION_RETENTION_DAYS (or the days given on the command line) and
+# prints the pending_blog table's size before and after. Run it from cron.
+# Rejected submissions are already gone: rejecting one deletes it.
+#
+#   python purge_submissions.py [days]
+
+import sys
+from datetime import datetime, timedelta
+
+from app import create_app, db, purge_moderated_submissions
+from engine import table_size
+from migrate_pending_blog_links import compact, describe
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        days = int(sys.argv[1]) if len(sys.argv) > 1 else app.config['SUBMISSION_RETENTION_DAYS']
+        with db.engine.connect() as connection:
+            before = table_size(connection, 'pending_blog')
+        removed = purge_moderated_submissions(datetime.utcnow() - timedelta(days=days))
+        db.session.commit()
+        compact()
+        with db.engine.connect() as connection:
+            after = table_size(connection, 'pending_blog')
+        print(f"Removed {removed} approved submissions sent more than {days} days ago.")
+        print(f"pending_blog size: {describe(before)} -> {describe(after)}")
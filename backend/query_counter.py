@@ -0,0 +1,35 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Collects every SQL statement executed on an engine while active."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine):
+    """Counts the SQL statements run against `engine` inside the block.
+
+    Used to assert that an endpoint runs a constant number of queries no
+    matter how many rows it returns (see tests/test_query_counts.py):
+
+        with app.app_context(), count_queries(db.engine) as counter:
+            client.get('/api/blogs')
+        assert counter.count == 2  # collection version + page
+    """
+    counter = QueryCounter()
+    event.listen(engine, 'before_cursor_execute', counter._before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, 'before_cursor_execute', counter._before_cursor_execute)
@@ -0,0 +1,62 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class RateLimitBackend:
+    """Storage interface for TokenBucketLimiter.
+
+    `take` must refill and debit one bucket atomically. A shared backend
+    (e.g. Redis running the same arithmetic in a Lua script) makes the
+    limits hold across every gunicorn worker and host; the in-process one
+    below gives each worker process its own buckets.
+    """
+
+    def take(self, key, capacity, refill_rate, cost):
+        """Returns seconds until `cost` tokens are available; 0.0 means they were taken."""
+        raise NotImplementedError
+
+
+class InProcessBucketBackend(RateLimitBackend):
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate, cost):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / refill_rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # Forgetting the least recently used bucket only ever makes a key less limited.
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class TokenBucketLimiter:
+    """Allows bursts of `capacity` requests per key, refilled at `per_minute`."""
+
+    def __init__(self, backend, capacity, per_minute):
+        self.backend = backend
+        self.capacity = capacity
+        self.refill_rate = per_minute / 60.0
+
+    @property
+    def enabled(self):
+        return self.capacity > 0 and self.refill_rate > 0
+
+    def hit(self, key, cost=1):
+        """Returns None if allowed, otherwise whole seconds to wait before retrying."""
+        if not self.enabled:
+            return None
+        wait = self.backend.take(key, self.capacity, self.refill_rate, cost)
+        return math.ceil(wait) if wait > 0 else None
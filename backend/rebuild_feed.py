@@ -0,0 +1,15 @@
+# rebuild_feed.py
+# Creates the feed tables on an existing database if needed and recomputes
+# every home-page feed row from the blog, user and comment tables, moving
+# every listing to a new version. Safe to re-run, e.g. after editing blogs
+# directly in the database.
+
+from app import create_app, db, rebuild_feed, FeedEntry, ListingVersion
+
+with create_app().app_context():
+    print("Rebuilding home page feed...")
+    FeedEntry.__table__.create(db.engine, checkfirst=True)
+    ListingVersion.__table__.create(db.engine, checkfirst=True)
+    rebuild_feed()
+    db.session.commit()
+    print(f"Feed rebuilt with {FeedEntry.query.count()} entries.")
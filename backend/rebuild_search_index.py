@@ -0,0 +1,12 @@
+# rebuild_search_index.py
+# Creates the full-text search objects on an existing database and indexes
+# every blog already in it. Safe to re-run.
+
+from app import create_app, db
+from search import rebuild_search_index
+
+with create_app().app_context():
+    print("Rebuilding blog search index...")
+    with db.engine.begin() as connection:
+        rebuild_search_index(connection)
+    print("Search index rebuilt successfully!")
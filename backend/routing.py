@@ -0,0 +1,62 @@
+import itertools
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+# Read-replica routing. GET/HEAD requests read from a replica; everything
+# else, and anything outside a request (media worker, scripts), uses the
+# primary. A client that has just written is pinned to the primary for a
+# few seconds so it reads its own writes despite replication lag.
+#
+# Clients are recognised by address: the frontend's cross-origin fetches
+# carry no cookies. A client pinned by mistake (e.g. behind a shared NAT)
+# merely reads from the primary. Behind a reverse proxy PROXY_FIX_HOPS must
+# be set, or every client has the proxy's address and any write pins them
+# all; app.py logs a warning when it sees X-Forwarded-For with hops at 0.
+
+
+class RoutingSession(Session):
+    """Session that sends reads to a replica when the request allows it."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and not isinstance(clause, UpdateBase)
+                and has_request_context() and g.get('read_from_replica')):
+            # One replica per session keeps a request's reads on one snapshot timeline.
+            engine = self.info.get('replica_engine')
+            if engine is None:
+                engine = self.info['replica_engine'] = current_app.extensions['replica_router'].next_replica()
+            return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    READ_METHODS = ('GET', 'HEAD')
+
+    def __init__(self, app, replica_engines, sticky_store, sticky_seconds=5):
+        self.replica_engines = list(replica_engines)
+        self.sticky_store = sticky_store
+        self.sticky_seconds = sticky_seconds
+        self._cycle = itertools.cycle(self.replica_engines)
+        app.extensions['replica_router'] = self
+        app.before_request(self._route_request)
+        app.after_request(self._remember_write)
+
+    def next_replica(self):
+        return next(self._cycle)
+
+    def _client_key(self):
+        return f'wrote:{request.remote_addr}'
+
+    def _route_request(self):
+        g.read_from_replica = bool(
+            self.replica_engines
+            and request.method in self.READ_METHODS
+            and not self.sticky_store.get(self._client_key())
+        )
+
+    def _remember_write(self, response):
+        if self.replica_engines and request.method not in self.READ_METHODS + ('OPTIONS',) \
+                and response.status_code < 400:
+            self.sticky_store.set(self._client_key(), True, self.sticky_seconds)
+        return response
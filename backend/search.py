@@ -0,0 +1,100 @@
+import re
+from sqlalchemy import DDL, event, false, func, literal_column, or_, table, column, text
+
+# Full-text search over blog title + content.
+#   SQLite:   an external-content FTS5 table (blog_fts) kept in sync by triggers.
+#   Postgres: a GIN expression index on to_tsvector(title || ' ' || content).
+# Any other dialect falls back to an unranked ILIKE over both columns.
+
+FTS_TABLE = 'blog_fts'
+TS_CONFIG = "'english'"
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+_SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(title, content, content='blog', content_rowid='id')",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON blog BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON blog BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, content ON blog BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+]
+
+_POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_blog_search ON blog USING GIN (to_tsvector({TS_CONFIG}, title || ' ' || content))",
+]
+
+_fts = table(FTS_TABLE, column('rowid'))
+
+
+def register_search_ddl(blog_table):
+    """Creates the search objects whenever db.create_all() creates the blog table."""
+    for statement in _SQLITE_DDL:
+        event.listen(blog_table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+    for statement in _POSTGRES_DDL:
+        event.listen(blog_table, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+
+
+def rebuild_search_index(connection):
+    """Creates missing search objects and re-indexes every existing blog."""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        for statement in _SQLITE_DDL:
+            connection.execute(text(statement))
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    elif dialect == 'postgresql':
+        for statement in _POSTGRES_DDL:
+            connection.execute(text(statement))
+        connection.execute(text("REINDEX INDEX ix_blog_search"))
+
+
+def drop_search_index(connection):
+    """Drops the triggers or index that keep search current, ahead of a bulk load.
+
+    rebuild_search_index restores them and indexes everything in one pass,
+    which is much faster than maintaining the index row by row.
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}"))
+    elif dialect == 'postgresql':
+        connection.execute(text("DROP INDEX IF EXISTS ix_blog_search"))
+
+
+def _terms(search_term):
+    return re.findall(r'\w+', search_term)
+
+
+def apply_search(query, blog_model, search_term, dialect):
+    """Filters `query` to blogs matching `search_term`.
+
+    Returns (query, order_by) where order_by ranks the best match first, or
+    (query, None) when the dialect has no ranking and the caller should keep
+    its default ordering. Each word is matched as a prefix so partially typed
+    words still match while the user is typing.
+    """
+    terms = _terms(search_term)
+    if not terms:
+        return query.filter(false()), None
+
+    if dialect == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        rank = func.bm25(literal_column(FTS_TABLE), TITLE_WEIGHT, CONTENT_WEIGHT)
+        query = query.join(_fts, _fts.c.rowid == blog_model.id).filter(literal_column(FTS_TABLE).op('MATCH')(match))
+        return query, [rank.asc(), blog_model.id.desc()]
+
+    if dialect == 'postgresql':
+        document = func.to_tsvector(literal_column(TS_CONFIG), blog_model.title.op('||')(literal_column("' '")).op('||')(blog_model.content))
+        ts_query = func.to_tsquery(literal_column(TS_CONFIG), ' & '.join(f'{term}:*' for term in terms))
+        query = query.filter(document.op('@@')(ts_query))
+        return query, [func.ts_rank(document, ts_query).desc(), blog_model.id.desc()]
+
+    for term in terms:
+        query = query.filter(or_(blog_model.title.ilike(f'%{term}%'), blog_model.content.ilike(f'%{term}%')))
+    return query, None
@@ -0,0 +1,139 @@
+import glob
+import hashlib
+import os
+import shutil
+import threading
+import time
+import uuid
+
+# Media storage backends. Both expose upload(path, folder, public_id) ->
+# {'public_id', 'secure_url'}, destroy(public_id) and destroy_many(public_ids);
+# the media worker in app.py picks one from MEDIA_BACKEND.
+
+# Files larger than this go to Cloudinary with the chunked upload API.
+CHUNKED_UPLOAD_THRESHOLD = 10 * 1024 * 1024
+CHUNKED_UPLOAD_CHUNK_SIZE = 6 * 1024 * 1024
+# Most public_ids one destroy_many call takes (Cloudinary's delete_resources limit).
+DELETE_BATCH_SIZE = 100
+
+
+def file_digest(path, length=32):
+    """Hex SHA-256 prefix of a file's content, used for content-addressed names."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:length]
+
+
+class CloudinaryStorage:
+    """Stores media on Cloudinary.
+
+    The SDK is imported and configured on the first upload or delete, which
+    happens on a media worker thread, so starting the app never pays for it.
+    """
+
+    def __init__(self, cloud_name=None, api_key=None, api_secret=None):
+        self.credentials = {'cloud_name': cloud_name, 'api_key': api_key, 'api_secret': api_secret}
+        self._sdk = None
+        self._lock = threading.Lock()
+
+    def _cloudinary(self):
+        if self._sdk is None:
+            with self._lock:
+                if self._sdk is None:
+                    import cloudinary
+                    import cloudinary.api
+                    import cloudinary.uploader
+                    cloudinary.config(**self.credentials)
+                    self._sdk = cloudinary
+        return self._sdk
+
+    def upload(self, path, folder, public_id=None):
+        uploader = self._cloudinary().uploader
+        if os.path.getsize(path) > CHUNKED_UPLOAD_THRESHOLD:
+            result = uploader.upload_large(path, folder=folder, public_id=public_id,
+                                           chunk_size=CHUNKED_UPLOAD_CHUNK_SIZE)
+        else:
+            result = uploader.upload(path, folder=folder, public_id=public_id)
+        return {'public_id': result['public_id'], 'secure_url': result['secure_url']}
+
+    def destroy(self, public_id):
+        self._cloudinary().uploader.destroy(public_id)
+
+    def destroy_many(self, public_ids):
+        api = self._cloudinary().api
+        for start in range(0, len(public_ids), DELETE_BATCH_SIZE):
+            api.delete_resources(public_ids[start:start + DELETE_BATCH_SIZE])
+
+
+class LocalStorage:
+    """Stores media under `root` and serves it from the /media route.
+
+    Files keep their public_id as the path (plus an extension), and the
+    worker derives public_ids from content hashes, so a URL never changes
+    meaning and can be cached forever.
+    """
+
+    def __init__(self, root, base_url):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip('/')
+
+    @staticmethod
+    def _extension(path):
+        extension = os.path.splitext(path)[1]
+        if extension:
+            return extension.lower()
+        from PIL import Image, UnidentifiedImageError
+        try:
+            with Image.open(path) as image:
+                return '.' + image.format.lower()
+        except (UnidentifiedImageError, OSError):
+            return '.bin'
+
+    def upload(self, path, folder, public_id=None):
+        public_id = f'{folder}/{public_id or file_digest(path)}'
+        relative_path = public_id + self._extension(path)
+        destination = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        # Copy then rename so a reader never sees a partially written file.
+        temporary = f'{destination}.{uuid.uuid4().hex}.tmp'
+        shutil.copyfile(path, temporary)
+        os.replace(temporary, destination)
+        return {'public_id': public_id, 'secure_url': f'{self.base_url}/media/{relative_path}'}
+
+    def destroy(self, public_id):
+        for path in glob.glob(glob.escape(os.path.join(self.root, public_id)) + '.*'):
+            os.remove(path)
+
+    def destroy_many(self, public_ids):
+        for public_id in public_ids:
+            self.destroy(public_id)
+
+
+class InstrumentedStorage:
+    """Wraps a storage backend and records each call's latency in `histogram`."""
+
+    def __init__(self, storage, histogram, backend_name):
+        self.storage = storage
+        self.histogram = histogram
+        self.backend_name = backend_name
+
+    def _timed(self, operation, call, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            self.histogram.observe(time.perf_counter() - start, backend=self.backend_name, operation=operation)
+
+    def upload(self, path, folder, public_id=None):
+        return self._timed('upload', self.storage.upload, path, folder, public_id)
+
+    def destroy(self, public_id):
+        return self._timed('destroy', self.storage.destroy, public_id)
+
+    def destroy_many(self, public_ids):
+        return self._timed('destroy_many', self.storage.destroy_many, public_ids)
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
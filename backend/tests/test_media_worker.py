@@ -0,0 +1,130 @@
+import io
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app, db, MediaJob, PendingBlog, User  # noqa: E402
+from storage import LocalStorage  # noqa: E402
+
+MAX_ATTEMPTS = 2
+
+
+@pytest.fixture
+def media_app(tmp_path, monkeypatch):
+    """An app storing media on local disk, with an admin (id 1) and a guest author (id 2)."""
+    monkeypatch.setenv('JWT_SECRET_KEY', 'test-secret')
+    monkeypatch.setenv('DATABASE_URL', 'sqlite:///' + str(tmp_path / 'media.db'))
+    monkeypatch.setenv('MEDIA_BACKEND', 'local')
+    monkeypatch.setenv('MEDIA_ROOT', str(tmp_path / 'media'))
+    monkeypatch.setenv('MEDIA_STAGING_DIR', str(tmp_path / 'staging'))
+    monkeypatch.setenv('MEDIA_WORKER_THREADS', '0')
+    monkeypatch.setenv('MEDIA_JOB_MAX_ATTEMPTS', str(MAX_ATTEMPTS))
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User(id=1, name="Admin", email="admin@example.com", password_hash='x', user_type='Admin'),
+            User(id=2, name="Guest", email="guest@example.com", password_hash='x', user_type='Guest Author'),
+        ])
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+def auth_headers(app, user_id, role):
+    with app.app_context():
+        return {'Authorization': f"Bearer {create_access_token(identity=str(user_id), additional_claims={'role': role})}"}
+
+
+def submit(app, width=2000, height=1000):
+    """Submits a blog with a `width` x `height` PNG as the guest author; returns the media job id."""
+    image = io.BytesIO()
+    Image.new('RGB', (width, height), 'red').save(image, 'PNG')
+    image.seek(0)
+    response = app.test_client().post('/api/blogs/submit', headers=auth_headers(app, 2, 'Guest Author'), data={
+        'title': "Red", 'content': "Body", 'image': (image, 'red.png')})
+    assert response.status_code == 201
+    return response.get_json()['media_job_id']
+
+
+def drain(app):
+    with app.app_context():
+        app.extensions['services']['media_worker'].drain()
+
+
+def approve(app, pending_id=1):
+    return app.test_client().post(f'/api/admin/blogs/approve/{pending_id}', headers=auth_headers(app, 1, 'Admin'))
+
+
+def staged_files(app):
+    return os.listdir(app.config['MEDIA_STAGING_DIR'])
+
+
+def test_upload_job_stores_every_variant(media_app):
+    job_id = submit(media_app)
+    drain(media_app)
+
+    with media_app.app_context():
+        assert db.session.get(MediaJob, job_id).status == 'done'
+        pending = db.session.get(PendingBlog, 1)
+        assert pending.image_status == 'ready'
+        urls = {'full': pending.image_url, 'card': pending.image_card_url, 'thumb': pending.image_thumb_url}
+    prefix = media_app.config['MEDIA_PUBLIC_URL'] + '/media/'
+    for variant, max_width in (('full', 1600), ('card', 800), ('thumb', 320)):
+        assert urls[variant].startswith(prefix + 'blog_images/')
+        with Image.open(os.path.join(media_app.config['MEDIA_ROOT'], urls[variant][len(prefix):])) as stored:
+            assert stored.format == 'WEBP'
+            assert stored.width == max_width
+    assert staged_files(media_app) == []
+
+
+def test_unprocessed_image_blocks_approval(media_app):
+    submit(media_app)
+    response = approve(media_app)
+    assert response.status_code == 409
+    assert response.get_json()['message'] == "The submission's image is still being processed."
+
+    drain(media_app)
+    assert approve(media_app).status_code == 200
+
+
+def test_storage_error_is_retried_with_backoff_then_fails(media_app, monkeypatch):
+    def unavailable(self, path, folder, public_id=None):
+        raise OSError("media host unavailable")
+    monkeypatch.setattr(LocalStorage, 'upload', unavailable)
+    job_id = submit(media_app)
+
+    drain(media_app)
+    with media_app.app_context():
+        job = db.session.get(MediaJob, job_id)
+        assert (job.status, job.attempts) == ('pending', 1)
+        assert job.last_error == "media host unavailable"
+        assert job.next_attempt_at > datetime.utcnow()
+        assert db.session.get(PendingBlog, 1).image_status == 'pending'
+        assert os.path.exists(job.staged_path)
+
+    # Not due again until its backoff has passed.
+    drain(media_app)
+    with media_app.app_context():
+        job = db.session.get(MediaJob, job_id)
+        assert job.attempts == 1
+        job.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+    drain(media_app)
+    with media_app.app_context():
+        job = db.session.get(MediaJob, job_id)
+        assert (job.status, job.attempts) == ('failed', MAX_ATTEMPTS)
+        assert db.session.get(PendingBlog, 1).image_status == 'failed'
+    assert staged_files(media_app) == []
+    assert media_app.test_client().get(f'/api/media-jobs/{job_id}').get_json()['status'] == 'failed'
+    assert approve(media_app).status_code == 409
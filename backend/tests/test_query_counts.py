@@ -0,0 +1,125 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app, db, rebuild_feed, Blog, Comment, PendingBlog, User  # noqa: E402
+from query_counter import count_queries  # noqa: E402
+
+N = 5
+
+
+@pytest.fixture
+def seeded_app(tmp_path, monkeypatch):
+    """Returns a factory for apps on fresh SQLite databases holding `rows` of everything.
+
+    Keyword arguments override environment settings for that app.
+    """
+    monkeypatch.setenv('JWT_SECRET_KEY', 'test-secret')
+    monkeypatch.setenv('RESPONSE_CACHE_TTL', '0')
+    monkeypatch.setenv('MEDIA_WORKER_THREADS', '0')
+    monkeypatch.setenv('MEDIA_STAGING_DIR', str(tmp_path / 'staging'))
+    apps = []
+
+    def make(rows, **env):
+        monkeypatch.setenv('DATABASE_URL', 'sqlite:///' + str(tmp_path / f'{rows}-{len(apps)}.db'))
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        app = create_app()
+        app.config['TESTING'] = True
+        with app.app_context():
+            db.create_all()
+            seed(rows)
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            db.engine.dispose()
+
+
+def seed(rows):
+    """Adds `rows` users, each with a blog, a pending submission and a comment on the first blog."""
+    start = datetime(2024, 1, 1)
+    users = [User(name=f"Author {i}", email=f"author{i}@example.com", password_hash='x', user_type='Author')
+             for i in range(rows)]
+    db.session.add_all(users)
+    db.session.flush()
+    blogs = [Blog(title=f"Blog {i}", content="Body", image_url='http://img/b.jpg', image_public_id=f"b{i}",
+                  pub_date=start + timedelta(minutes=i), user_id=user.id) for i, user in enumerate(users)]
+    db.session.add_all(blogs)
+    db.session.add_all(PendingBlog(title=f"Pending {i}", content="Body", image_url='http://img/p.jpg',
+                                   image_public_id=f"p{i}", submitted_date=start + timedelta(minutes=i),
+                                   user_id=user.id) for i, user in enumerate(users))
+    db.session.flush()
+    db.session.add_all(Comment(content="Nice", user_id=user.id, blog_id=blogs[0].id) for user in users)
+    rebuild_feed()
+    db.session.commit()
+
+
+def admin_headers(app):
+    with app.app_context():
+        return {'Authorization': f"Bearer {create_access_token(identity='1', additional_claims={'role': 'Admin'})}"}
+
+
+def query_counts(app):
+    """Returns the number of SQL statements each listing endpoint runs against `app`'s database."""
+    client = app.test_client()
+    headers = admin_headers(app)
+    # Loads the token denylist, which is then re-read only every few seconds.
+    client.get('/api/admin/pending-blogs', headers=headers)
+    counts = {}
+    for endpoint, url in [('get_blogs', '/api/blogs?limit=100'),
+                          ('get_pending_blogs', '/api/admin/pending-blogs'),
+                          ('get_single_blog', '/api/blogs/1'),
+                          ('get_single_pending_blog', '/api/admin/pending-blogs/1')]:
+        with app.app_context(), count_queries(db.engine) as counter:
+            response = client.get(url, headers=headers)
+        assert response.status_code == 200, url
+        counts[endpoint] = counter.count
+    return counts
+
+
+def test_listing_endpoints_run_constant_queries(seeded_app):
+    small = seeded_app(N)
+    large = seeded_app(3 * N)
+    assert len(large.test_client().get('/api/blogs?limit=100').get_json()['blogs']) == 3 * N
+    assert query_counts(large) == query_counts(small)
+
+
+def revalidation_statements(app, url):
+    """Fetches `url` twice, then returns the ETag and the statements run by a 304 and by a cache hit."""
+    client = app.test_client()
+    etag = client.get(url).headers['ETag']
+    with app.app_context(), count_queries(db.engine) as not_modified:
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    with app.app_context(), count_queries(db.engine) as cached:
+        assert client.get(url).status_code == 200
+    return etag, not_modified.statements, cached.statements
+
+
+def test_listing_revalidation_is_one_primary_key_lookup(seeded_app):
+    for rows in (N, 3 * N):
+        app = seeded_app(rows, RESPONSE_CACHE_TTL='30')
+        for url in ('/api/blogs', '/api/blogs?category=General'):
+            _, not_modified, cached = revalidation_statements(app, url)
+            assert len(not_modified) == len(cached) == 1
+            assert 'listing_version' in not_modified[0] and 'feed_entry' not in not_modified[0]
+
+
+def test_listing_etag_changes_when_a_blog_is_published(seeded_app):
+    app = seeded_app(N, RESPONSE_CACHE_TTL='30')
+    client = app.test_client()
+    before = {url: client.get(url).headers['ETag'] for url in ('/api/blogs', '/api/blogs?category=General')}
+    response = client.post('/api/admin/blogs/approve/1', headers=admin_headers(app))
+    assert response.status_code == 200
+    for url, etag in before.items():
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert len(response.get_json()['blogs']) == N + 1
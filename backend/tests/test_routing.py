@@ -0,0 +1,69 @@
+import os
+import shutil
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app, db, Blog, User  # noqa: E402
+
+
+@pytest.fixture
+def replicated_app(tmp_path, monkeypatch):
+    """An app on two SQLite files holding the same blog, titled "Primary" or "Replica" by file."""
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    monkeypatch.setenv('JWT_SECRET_KEY', 'test-secret')
+    monkeypatch.setenv('RESPONSE_CACHE_TTL', '0')
+    monkeypatch.setenv('MEDIA_WORKER_THREADS', '0')
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{primary}')
+    monkeypatch.setenv('DATABASE_REPLICA_URLS', f'sqlite:///{replica}')
+    monkeypatch.setenv('REPLICA_STICKY_SECONDS', '30')
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.create_all()
+        user = User(name="Reader", email="reader@example.com", password_hash='x', user_type='Normal User')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Blog(title="Primary", content="Body", image_url='http://img/b.jpg', image_public_id='b',
+                            user_id=user.id))
+        db.session.commit()
+        db.engine.dispose()
+    shutil.copyfile(primary, replica)
+    with sqlite3.connect(replica) as connection:
+        connection.execute("UPDATE blog SET title = 'Replica'")
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+    for engine in app.extensions['replica_router'].replica_engines:
+        engine.dispose()
+
+
+def client_at(app, address):
+    client = app.test_client()
+    client.environ_base['REMOTE_ADDR'] = address
+    return client
+
+
+def test_anonymous_reads_go_to_the_replica(replicated_app):
+    response = client_at(replicated_app, '10.0.0.1').get('/api/blogs/1')
+    assert response.status_code == 200
+    assert response.get_json()['title'] == "Replica"
+
+
+def test_writer_reads_its_own_writes_from_the_primary(replicated_app):
+    with replicated_app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='1', additional_claims={'role': 'Normal User'})}"}
+    writer, other = client_at(replicated_app, '10.0.0.1'), client_at(replicated_app, '10.0.0.2')
+
+    response = writer.post('/api/blogs/1/comments', headers=headers, json={'content': "First!"})
+    assert response.status_code == 201
+
+    assert writer.get('/api/blogs/1').get_json()['title'] == "Primary"
+    assert [comment['content'] for comment in writer.get('/api/blogs/1/comments').get_json()['comments']] == ["First!"]
+    assert other.get('/api/blogs/1').get_json()['title'] == "Replica"
+    assert other.get('/api/blogs/1/comments').get_json()['comments'] == []
@@ -0,0 +1,23 @@
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import check_startup  # noqa: E402
+
+RUNS = 3
+
+
+def test_startup_within_budget_without_eager_clients_or_connections(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', 'sqlite:///' + str(tmp_path / 'startup.db'))
+    monkeypatch.setenv('JWT_SECRET_KEY', 'test-secret')
+    budget_ms = float(os.environ.get('STARTUP_BUDGET_MS', 1000))
+
+    samples = [check_startup.measure() for _ in range(RUNS)]
+
+    total_ms = statistics.median(sample['import_ms'] + sample['create_ms'] for sample in samples)
+    assert total_ms <= budget_ms
+    assert [sample['loaded'] for sample in samples] == [[]] * RUNS
+    assert [sample['connections'] for sample in samples] == [0] * RUNS
+    assert not (tmp_path / 'startup.db').exists()
@@ -0,0 +1,97 @@
+import os
+import uuid
+
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+# Streaming multipart reader for the image upload endpoints. Small form
+# fields are buffered; the image part is written to the staging directory
+# chunk by chunk, so a request never holds more than CHUNK_SIZE bytes of
+# the file in memory. Metadata is validated as soon as the image part
+# starts, which lets a bad request be rejected before its body is read.
+
+CHUNK_SIZE = 64 * 1024
+MAX_FIELD_SIZE = 2 * 1024 * 1024
+
+
+def receive_upload(request, file_field, staging_dir, required_fields, validate):
+    """Streams a multipart request body.
+
+    `validate(fields, has_file)` returns None or a (message, status) error.
+    It runs as soon as the `file_field` part begins if every name in
+    `required_fields` has already arrived (clients should send text fields
+    first); otherwise it runs once the whole body has been read.
+
+    Returns (fields, staged_path, error). staged_path is None when no
+    non-empty file was sent; on error nothing is left in the staging dir.
+    A malformed body is a 400 and an oversized field or body a 413.
+    """
+    boundary = request.mimetype_params.get('boundary')
+    if request.mimetype != 'multipart/form-data' or not boundary:
+        return {}, None, ("Expected a multipart/form-data request.", 400)
+
+    decoder = MultipartDecoder(boundary.encode(), max_form_memory_size=MAX_FIELD_SIZE)
+    fields = {}
+    staged_path = None
+    validated = False
+    current = None
+    buffer = None
+    sink = None
+
+    def fail(error):
+        if sink:
+            sink.close()
+        if staged_path and os.path.exists(staged_path):
+            os.remove(staged_path)
+        return fields, None, error
+
+    eof = False
+    try:
+        stream = request.stream
+        while True:
+            event = decoder.next_event()
+            if isinstance(event, NeedData):
+                if eof:
+                    return fail(("Incomplete multipart body.", 400))
+                chunk = stream.read(CHUNK_SIZE)
+                eof = not chunk
+                decoder.receive_data(chunk or None)
+                continue
+            if isinstance(event, Epilogue):
+                break
+            if isinstance(event, Field):
+                current, buffer = event, []
+            elif isinstance(event, File):
+                current, buffer = event, None
+                if event.name == file_field and event.filename and staged_path is None:
+                    if all(fields.get(name) for name in required_fields):
+                        error = validate(fields, True)
+                        if error:
+                            return fail(error)
+                        validated = True
+                    os.makedirs(staging_dir, exist_ok=True)
+                    staged_path = os.path.join(staging_dir, uuid.uuid4().hex)
+                    sink = open(staged_path, 'wb')
+            elif isinstance(event, Data):
+                if isinstance(current, Field):
+                    buffer.append(event.data)
+                    if not event.more_data:
+                        fields[current.name] = b''.join(buffer).decode('utf-8', 'replace')
+                elif sink is not None and current.name == file_field:
+                    sink.write(event.data)
+                    if not event.more_data:
+                        sink.close()
+                        sink = None
+                # Data of any other file part is discarded.
+    except RequestEntityTooLarge:
+        return fail(("Upload is too large.", 413))
+    except ValueError:
+        return fail(("Malformed multipart body.", 400))
+
+    if sink:
+        sink.close()
+    if not validated:
+        error = validate(fields, staged_path is not None)
+        if error:
+            return fail(error)
+    return fields, staged_path, None
@@ -0,0 +1,7 @@
+# wsgi.py
+# WSGI entry point for gunicorn: `gunicorn -c gunicorn.conf.py wsgi:app`.
+# Run `python migrations.py` before starting new workers after a deploy.
+
+from app import create_app
+
+app = create_app()
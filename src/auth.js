@@ -0,0 +1,56 @@
+// filename: src/auth.js
+const apiBaseUrl = import.meta.env.VITE_API_BASE_URL;
+
+export function saveSession(data) {
+    localStorage.setItem('user', JSON.stringify(data.user));
+    localStorage.setItem('accessToken', data.access_token);
+    localStorage.setItem('refreshToken', data.refresh_token);
+}
+
+export function clearSession() {
+    localStorage.removeItem('user');
+    localStorage.removeItem('accessToken');
+    localStorage.removeItem('refreshToken');
+}
+
+async function refreshAccessToken() {
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (!refreshToken) return false;
+    const response = await fetch(`${apiBaseUrl}/api/token/refresh`, {
+        method: 'POST',
+        headers: { Authorization: `Bearer ${refreshToken}` },
+    });
+    if (!response.ok) return false;
+    const data = await response.json();
+    localStorage.setItem('accessToken', data.access_token);
+    return true;
+}
+
+// fetch() with the access token attached; on a 401 the token is refreshed once and the request retried.
+export async function authFetch(url, options = {}) {
+    const send = () => fetch(url, {
+        ...options,
+        headers: { ...options.headers, Authorization: `Bearer ${localStorage.getItem('accessToken')}` },
+    });
+    const response = await send();
+    if (response.status === 401 && await refreshAccessToken()) {
+        return send();
+    }
+    return response;
+}
+
+export async function logout() {
+    const accessToken = localStorage.getItem('accessToken');
+    if (accessToken) {
+        try {
+            await fetch(`${apiBaseUrl}/api/logout`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', Authorization: `Bearer ${accessToken}` },
+                body: JSON.stringify({ refreshToken: localStorage.getItem('refreshToken') }),
+            });
+        } catch (error) {
+            console.error("Logout error:", error);
+        }
+    }
+    clearSession();
+}
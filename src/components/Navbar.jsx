@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
+import { logout } from '../auth';
 import './Navbar.css';
 
 function Navbar() {
@@ -33,8 +34,8 @@ function Navbar() {
         };
     }, []);
 
-    const handleLogout = () => {
-        localStorage.removeItem('user');
+    const handleLogout = async () => {
+        await logout();
         setUser(null);
         setDropdownVisible(false);
         navigate('/');
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import Navbar from '../components/Navbar';
 import Footer from '../components/Footer';
+import { authFetch } from '../auth';
 import './AddBlog.css';
 
 function AddBlog({ isAdmin = false }) {
@@ -49,15 +50,15 @@ function AddBlog({ isAdmin = false }) {
         const formData = new FormData();
         formData.append('title', title);
         formData.append('content', content);
-        formData.append('image', image);
-        formData.append('userId', user.id);
         // --- UPDATE: Append category to form data ---
         formData.append('category', category);
+        // The image goes last so the server can validate the fields before reading it.
+        formData.append('image', image);
 
         const baseUrl = import.meta.env.VITE_API_BASE_URL;
         const endpoint = isAdmin ? `${baseUrl}/api/admin/blogs/create` : `${baseUrl}/api/blogs/submit`;
         try {
-            const response = await fetch(endpoint, {
+            const response = await authFetch(endpoint, {
                 method: 'POST',
                 body: formData,
             });
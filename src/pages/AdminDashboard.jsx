@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import Navbar from '../components/Navbar';
 import Footer from '../components/Footer';
+import { authFetch } from '../auth';
 import './AdminDashboard.css';
 
 function AdminDashboard() {
@@ -9,8 +10,11 @@ function AdminDashboard() {
     const [activeTab, setActiveTab] = useState('pending');
     const [pendingBlogs, setPendingBlogs] = useState([]);
     const [publishedBlogs, setPublishedBlogs] = useState([]);
+    const [publishedCursor, setPublishedCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [loading, setLoading] = useState(true);
     const [user, setUser] = useState(null);
+    const [selectedIds, setSelectedIds] = useState([]);
 
     const apiBaseUrl = import.meta.env.VITE_API_BASE_URL;
 
@@ -18,19 +22,37 @@ function AdminDashboard() {
         setLoading(true);
         try {
             const [pendingRes, publishedRes] = await Promise.all([
-                fetch(`${apiBaseUrl}/api/admin/pending-blogs`),
-                fetch(`${apiBaseUrl}/api/blogs`)
+                authFetch(`${apiBaseUrl}/api/admin/pending-blogs`),
+                fetch(`${apiBaseUrl}/api/blogs?limit=100`)
             ]);
             const pendingData = await pendingRes.json();
             const publishedData = await publishedRes.json();
             setPendingBlogs(pendingData.pending_blogs || []);
+            setSelectedIds([]);
             setPublishedBlogs(publishedData.blogs || []);
+            setPublishedCursor(publishedData.next_cursor);
         } catch (error) {
             console.error("Failed to fetch dashboard data:", error);
         } finally {
             setLoading(false);
         }
     };
+
+    const handleLoadMorePublished = async () => {
+        if (!publishedCursor) return;
+        setLoadingMore(true);
+        try {
+            const response = await fetch(`${apiBaseUrl}/api/blogs?limit=100&cursor=${encodeURIComponent(publishedCursor)}`);
+            if (!response.ok) throw new Error('Network response was not ok');
+            const data = await response.json();
+            setPublishedBlogs(prev => [...prev, ...data.blogs]);
+            setPublishedCursor(data.next_cursor);
+        } catch (error) {
+            console.error("Failed to fetch more published blogs:", error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
     
     useEffect(() => {
         const storedUser = localStorage.getItem('user');
@@ -43,12 +65,13 @@ function AdminDashboard() {
     const handleApprove = async (id) => {
         if (!window.confirm("Are you sure you want to approve and publish this blog?")) return;
         try {
-            const response = await fetch(`${apiBaseUrl}/api/admin/blogs/approve/${id}`, { method: 'POST' });
+            const response = await authFetch(`${apiBaseUrl}/api/admin/blogs/approve/${id}`, { method: 'POST' });
             if (response.ok) {
                 alert("Blog approved and published!");
                 await fetchAllData();
             } else {
-                alert("Failed to approve blog.");
+                const data = await response.json();
+                alert(data.message || "Failed to approve blog.");
             }
         } catch (error) {
             alert("Server error during approval.");
@@ -64,7 +87,7 @@ function AdminDashboard() {
         }
 
         try {
-            const response = await fetch(`${apiBaseUrl}/api/admin/blogs/reject/${id}`, {
+            const response = await authFetch(`${apiBaseUrl}/api/admin/blogs/reject/${id}`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ reason })
@@ -81,6 +104,44 @@ function AdminDashboard() {
         }
     };
 
+    const toggleSelected = (id) => {
+        setSelectedIds(ids => ids.includes(id) ? ids.filter(other => other !== id) : [...ids, id]);
+    };
+
+    const toggleSelectAll = () => {
+        setSelectedIds(ids => ids.length === pendingBlogs.length ? [] : pendingBlogs.map(blog => blog.id));
+    };
+
+    // Moderates every selected submission in one request; the server reports a result per id.
+    const handleBulk = async (action) => {
+        const body = { ids: selectedIds };
+        if (action === 'reject') {
+            const reason = window.prompt(`Please provide a reason for rejecting these ${selectedIds.length} blogs:`);
+            if (reason === null) return;
+            if (!reason.trim()) {
+                alert("Rejection reason cannot be empty.");
+                return;
+            }
+            body.reason = reason;
+        } else if (!window.confirm(`Approve and publish ${selectedIds.length} blogs?`)) {
+            return;
+        }
+
+        try {
+            const response = await authFetch(`${apiBaseUrl}/api/admin/blogs/${action}`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(body)
+            });
+            const data = await response.json();
+            alert(data.message);
+            await fetchAllData();
+        } catch (error) {
+            console.error("Bulk moderation error:", error);
+            alert("Server error during moderation.");
+        }
+    };
+
     const handleDeletePublished = async (id) => {
         if (!window.confirm("Are you sure you want to permanently delete this blog? This action cannot be undone.")) return;
         if (!user) {
@@ -89,11 +150,7 @@ function AdminDashboard() {
         }
 
         try {
-            const response = await fetch(`${apiBaseUrl}/api/blogs/${id}`, {
-                method: 'DELETE',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ adminUserId: user.id })
-            });
+            const response = await authFetch(`${apiBaseUrl}/api/blogs/${id}`, { method: 'DELETE' });
 
             if (response.ok) {
                 alert("Blog deleted successfully.");
@@ -119,7 +176,7 @@ function AdminDashboard() {
                         Pending Submissions ({pendingBlogs.length})
                     </button>
                     <button onClick={() => setActiveTab('published')} className={activeTab === 'published' ? 'active' : ''}>
-                        Manage Published Blogs ({publishedBlogs.length})
+                        Manage Published Blogs ({publishedBlogs.length}{publishedCursor ? '+' : ''})
                     </button>
                 </div>
                 
@@ -127,8 +184,23 @@ function AdminDashboard() {
                     {loading ? <p style={{ textAlign: 'center' }}>Loading...</p> : (
                         activeTab === 'pending' ? (
                             <div className="blogs-list">
+                                {pendingBlogs.length > 0 && (
+                                    <div className="bulk-actions">
+                                        <label>
+                                            <input type="checkbox" checked={selectedIds.length === pendingBlogs.length} onChange={toggleSelectAll} />
+                                            Select all
+                                        </label>
+                                        <button onClick={() => handleBulk('approve')} disabled={!selectedIds.length} className="approve-btn">
+                                            Approve selected ({selectedIds.length})
+                                        </button>
+                                        <button onClick={() => handleBulk('reject')} disabled={!selectedIds.length} className="reject-btn">
+                                            Reject selected ({selectedIds.length})
+                                        </button>
+                                    </div>
+                                )}
                                 {pendingBlogs.length > 0 ? pendingBlogs.map(blog => (
                                     <div key={blog.id} className="list-item">
+                                        <input type="checkbox" checked={selectedIds.includes(blog.id)} onChange={() => toggleSelected(blog.id)} />
                                         <div className="item-info">
                                             <h3>{blog.title}</h3>
                                             <p>by {blog.author_name} on {blog.submitted_date}</p>
@@ -155,6 +227,13 @@ function AdminDashboard() {
                                         </div>
                                     </div>
                                 )) : <p style={{ textAlign: 'center' }}>No blogs have been published yet.</p>}
+                                {publishedCursor && (
+                                    <div className="load-more-container">
+                                        <button onClick={handleLoadMorePublished} className="load-more-button" disabled={loadingMore}>
+                                            {loadingMore ? 'Loading...' : 'Load More'}
+                                        </button>
+                                    </div>
+                                )}
                             </div>
                         )
                     )}
@@ -1,6 +1,7 @@
 // filename: src/pages/AdminLogin.jsx
 import React, { useState } from 'react';
 import { useNavigate, Link } from 'react-router-dom';
+import { saveSession } from '../auth';
 import './AdminLogin.css';
 
 function AdminLogin() {
@@ -25,7 +26,7 @@ function AdminLogin() {
       const data = await response.json();
 
       if (response.ok) {
-        localStorage.setItem('user', JSON.stringify(data.user));
+        saveSession(data);
         alert(data.message);
         navigate('/home');
       } else {
@@ -1,5 +1,6 @@
 import React, { useState } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
+import { saveSession } from '../auth';
 import './GuestLogin.css';
 
 function GuestLogin() {
@@ -21,7 +22,7 @@ function GuestLogin() {
       });
       const data = await response.json();
       if (response.ok) {
-        localStorage.setItem('user', JSON.stringify(data.user));
+        saveSession(data);
         alert(data.message);
         navigate('/home');
       } else {
@@ -13,6 +13,8 @@ function Home() {
   const [searchTerm, setSearchTerm] = useState('');
   // --- NEW: State for category filtering ---
   const [activeCategory, setActiveCategory] = useState('All');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const user = localStorage.getItem('user');
@@ -21,24 +23,46 @@ function Home() {
     }
   }, [navigate]);
   
+  // --- Build URL with search, category and (optional) pagination cursor ---
+  const buildBlogsUrl = (cursor) => {
+    const params = new URLSearchParams();
+    if (searchTerm) {
+      params.append('q', searchTerm);
+    }
+    if (activeCategory && activeCategory !== 'All') {
+      params.append('category', activeCategory);
+    }
+    if (cursor) {
+      params.append('cursor', cursor);
+    }
+    return `${import.meta.env.VITE_API_BASE_URL}/api/blogs?${params.toString()}`;
+  };
+
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await fetch(buildBlogsUrl(nextCursor));
+      if (!response.ok) throw new Error('Network response was not ok');
+      const data = await response.json();
+      setBlogs(prev => [...prev, ...data.blogs]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      console.error("Failed to fetch more blogs:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     const fetchBlogs = async () => {
       setLoading(true);
-      // --- UPDATE: Build URL with search and category ---
-      const params = new URLSearchParams();
-      if (searchTerm) {
-        params.append('q', searchTerm);
-      }
-      if (activeCategory && activeCategory !== 'All') {
-        params.append('category', activeCategory);
-      }
-      const url = `${import.meta.env.VITE_API_BASE_URL}/api/blogs?${params.toString()}`;
-      
       try {
-        const response = await fetch(url);
+        const response = await fetch(buildBlogsUrl(null));
         if (!response.ok) throw new Error('Network response was not ok');
         const data = await response.json();
         setBlogs(data.blogs);
+        setNextCursor(data.next_cursor);
       } catch (error) {
         console.error("Failed to fetch blogs:", error);
       } finally {
@@ -63,7 +87,7 @@ function Home() {
           <div className="search-bar-container">
             <input 
               type="text"
-              placeholder="Search for blogs by title..."
+              placeholder="Search blogs..."
               className="search-bar"
               value={searchTerm}
               onChange={(e) => setSearchTerm(e.target.value)}
@@ -111,6 +135,14 @@ function Home() {
             <p>No blogs found for your search or filter.</p>
           )}
         </main>
+
+        {!loading && nextCursor && (
+          <div className="load-more-container">
+            <button onClick={handleLoadMore} className="load-more-button" disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load More'}
+            </button>
+          </div>
+        )}
       </div>
       <Footer />
     </>
@@ -1,5 +1,6 @@
 import React, { useState } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
+import { saveSession } from '../auth';
 import './Login.css';
 
 function Login() {
@@ -25,7 +26,7 @@ function Login() {
             const data = await response.json();
 
             if (response.ok) {
-                localStorage.setItem('user', JSON.stringify(data.user));
+                saveSession(data);
                 navigate('/home');
             } else {
                 setMessage(data.message);
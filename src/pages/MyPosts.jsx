@@ -1,6 +1,8 @@
 import React, { useState, useEffect } from 'react';
+import { Link } from 'react-router-dom';
 import Navbar from '../components/Navbar';
 import Footer from '../components/Footer';
+import { authFetch } from '../auth';
 import './MyPosts.css';
 
 function MyPosts() {
@@ -36,11 +38,7 @@ function MyPosts() {
             return;
         }
         try {
-            const response = await fetch(`${apiBaseUrl}/api/author/my-posts/${postId}`, {
-                method: 'DELETE',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ userId: user.id })
-            });
+            const response = await authFetch(`${apiBaseUrl}/api/author/my-posts/${postId}`, { method: 'DELETE' });
 
             if (response.ok) {
                 alert("Submission deleted successfully.");
@@ -72,7 +70,7 @@ function MyPosts() {
                                 <div key={post.id} className="post-item-wrapper">
                                     <div className="post-item">
                                         <div className="post-info">
-                                            <h3>{post.title}</h3>
+                                            <h3>{post.blog_id ? <Link to={`/blog/${post.blog_id}`}>{post.title}</Link> : post.title}</h3>
                                             <p>Submitted on: {post.submitted_date}</p>
                                         </div>
                                         <div className="post-status">
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import Navbar from '../components/Navbar';
 import Footer from '../components/Footer';
+import { authFetch } from '../auth';
 import './Profile.css';
 
 function Profile() {
@@ -31,6 +32,26 @@ function Profile() {
         }
     };
 
+    // Polls until the upload job is done or failed, backing off from 1s to 15s between checks.
+    const waitForMediaJob = async (jobId) => {
+        const apiUrl = `${import.meta.env.VITE_API_BASE_URL}/api/media-jobs/${jobId}`;
+        let delay = 1000;
+        for (let attempt = 0; ; attempt++) {
+            const response = await fetch(apiUrl);
+            if (response.status === 404) return null;
+            if (response.ok) {
+                const job = await response.json();
+                if (job.status === 'done') return job.image_url;
+                if (job.status === 'failed') return null;
+            }
+            if (attempt === 5) {
+                setMessage('Your image is still processing. It will appear here once it is ready.');
+            }
+            await new Promise(resolve => setTimeout(resolve, delay));
+            delay = Math.min(delay * 2, 15000);
+        }
+    };
+
     const handleSubmit = async (e) => {
         e.preventDefault();
         if (!profileImage) {
@@ -40,12 +61,11 @@ function Profile() {
         }
 
         const formData = new FormData();
-        formData.append('userId', user.id);
         formData.append('profileImage', profileImage);
 
         try {
             const apiUrl = `${import.meta.env.VITE_API_BASE_URL}/api/user/profile-image`;
-            const response = await fetch(apiUrl, {
+            const response = await authFetch(apiUrl, {
                 method: 'POST',
                 body: formData,
             });
@@ -55,9 +75,18 @@ function Profile() {
             if (response.ok) {
                 setMessage(data.message);
                 setMessageType('success');
+
+                // The upload runs in the background; wait for the new image URL.
+                const imageUrl = data.media_job_id ? await waitForMediaJob(data.media_job_id) : data.profile_image_url;
+                if (!imageUrl) {
+                    setMessage('Image upload failed. Please try again.');
+                    setMessageType('error');
+                    return;
+                }
+                setMessage('Profile image updated successfully.');
                 
                 // Update user info in localStorage
-                const updatedUser = { ...user, profile_image_url: data.profile_image_url };
+                const updatedUser = { ...user, profile_image_url: imageUrl };
                 localStorage.setItem('user', JSON.stringify(updatedUser));
                 setUser(updatedUser);
                 
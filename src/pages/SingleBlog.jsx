@@ -4,6 +4,7 @@ import React, { useState, useEffect, useCallback } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import Navbar from '../components/Navbar.jsx';
 import Footer from '../components/Footer.jsx';
+import { authFetch } from '../auth';
 import './SingleBlog.css';
 
 function SingleBlog() {
@@ -13,6 +14,7 @@ function SingleBlog() {
     const [error, setError] = useState('');
     const [newComment, setNewComment] = useState('');
     const [currentUser, setCurrentUser] = useState(null);
+    const [loadingMoreComments, setLoadingMoreComments] = useState(false);
 
     // FIX: Environment Variable को एक constant में store करें
     const API_BASE_URL = import.meta.env.VITE_API_BASE_URL;
@@ -43,15 +45,35 @@ function SingleBlog() {
         fetchBlog();
     }, [fetchBlog]);
 
+    const handleLoadMoreComments = async () => {
+        if (!blog?.comments_next_cursor) return;
+        setLoadingMoreComments(true);
+        try {
+            const params = new URLSearchParams({ cursor: blog.comments_next_cursor });
+            const response = await fetch(`${API_BASE_URL}/api/blogs/${blogId}/comments?${params.toString()}`);
+            if (!response.ok) throw new Error('Could not load more comments.');
+            const data = await response.json();
+            setBlog(prev => ({
+                ...prev,
+                comments: [...prev.comments, ...data.comments],
+                comments_next_cursor: data.next_cursor
+            }));
+        } catch (err) {
+            alert(err.message);
+        } finally {
+            setLoadingMoreComments(false);
+        }
+    };
+
     const handleCommentSubmit = async (e) => {
         e.preventDefault();
         if (!newComment.trim() || !currentUser) return;
         try {
             // FIX: यहाँ भी API_BASE_URL का उपयोग करें
-            const response = await fetch(`${API_BASE_URL}/api/blogs/${blogId}/comments`, {
+            const response = await authFetch(`${API_BASE_URL}/api/blogs/${blogId}/comments`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ content: newComment, userId: currentUser.id }),
+                body: JSON.stringify({ content: newComment }),
             });
             if (response.ok) {
                 setNewComment('');
@@ -68,11 +90,7 @@ function SingleBlog() {
         if (!currentUser || !window.confirm("Are you sure you want to delete this comment?")) return;
         try {
             // FIX: और यहाँ भी API_BASE_URL का उपयोग करें
-            const response = await fetch(`${API_BASE_URL}/api/comments/${commentId}`, {
-                method: 'DELETE',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ userId: currentUser.id }),
-            });
+            const response = await authFetch(`${API_BASE_URL}/api/comments/${commentId}`, { method: 'DELETE' });
             if(response.ok) {
                 alert("Comment deleted.");
                 fetchBlog();
@@ -111,7 +129,7 @@ function SingleBlog() {
                     </article>
                     
                     <section className="comments-section">
-                        <h3>Comments ({blog.comments?.length || 0})</h3>
+                        <h3>Comments ({blog.comment_count || 0})</h3>
                         {currentUser && (
                             <form onSubmit={handleCommentSubmit} className="comment-form">
                                 <div className="comment-input-area">
@@ -154,6 +172,13 @@ function SingleBlog() {
                                 <p className="no-comments-message">Be the first to comment!</p>
                             )}
                         </div>
+                        {blog.comments_next_cursor && (
+                            <div className="load-more-comments">
+                                <button onClick={handleLoadMoreComments} disabled={loadingMoreComments}>
+                                    {loadingMoreComments ? 'Loading...' : 'Load more comments'}
+                                </button>
+                            </div>
+                        )}
                     </section>
                 </div>
             </div>
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate, useParams } from 'react-router-dom';
 import Navbar from '../components/Navbar';
+import { authFetch } from '../auth';
 import './AddBlog.css'; // We can reuse the CSS from AddBlog
 
 function UpdateBlog() {
@@ -55,15 +56,14 @@ function UpdateBlog() {
         formData.append('title', title);
         formData.append('content', content);
         formData.append('category', category);
+        // The image goes last so the server can validate the fields before reading it.
         if (image) {
             formData.append('image', image);
         }
-        // --- FIX: Append the admin's user ID for backend authorization ---
-        formData.append('adminUserId', user.id);
 
         try {
           const apiUrl = `${import.meta.env.VITE_API_BASE_URL}/api/blogs/${blogId}`;
-          const response = await fetch(apiUrl,{
+          const response = await authFetch(apiUrl,{
                 method: 'PUT',
                 body: formData,
             });
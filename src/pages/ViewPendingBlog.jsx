@@ -2,6 +2,7 @@ import React, { useState, useEffect, useCallback } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import Navbar from '../components/Navbar.jsx';
 import Footer from '../components/Footer.jsx';
+import { authFetch } from '../auth';
 import './SingleBlog.css'; // We can reuse the CSS
 
 function ViewPendingBlog() {
@@ -17,7 +18,7 @@ function ViewPendingBlog() {
 
         // SIRF YEH EK LINE HONI CHAHIYE
         const apiUrl = `${import.meta.env.VITE_API_BASE_URL}/api/admin/pending-blogs/${pendingId}`;
-        const response = await fetch(apiUrl);
+        const response = await authFetch(apiUrl);
 
         if (!response.ok) {
             throw new Error('Could not find the pending blog!');